@@ -15,10 +15,14 @@ def find_venv_python(venv_dir: Path) -> Path:
     return candidate if candidate.exists() else None
 
 def clear_screen():
-    if os.name == "nt":
+    if not sys.stdout.isatty():
+        return
+    # Windows Terminal understands ANSI escapes; the legacy console only does once VT mode is enabled, so keep cls there.
+    if os.name == "nt" and "WT_SESSION" not in os.environ:
         os.system("cls")
     else:
-        os.system("clear")
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
 
 def main():
     script_dir = Path(__file__).resolve().parent
@@ -48,6 +52,14 @@ def main():
         sys.exit(1)
 
     cmd = [str(venv_python), str(main_py)] + sys.argv[1:]
+    if os.name == "posix":
+        # Replace this wrapper with main.py instead of waiting on it as a child process.
+        # The final prompt is then shown by main.py itself (only when someone is there to press Enter).
+        if sys.stdin.isatty():
+            cmd.insert(2, "--pause-on-exit")
+        sys.stdout.flush()
+        os.execv(cmd[0], cmd)
+
     try:
         res = subprocess.run(cmd)
     except KeyboardInterrupt:
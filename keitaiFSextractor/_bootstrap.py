@@ -0,0 +1,153 @@
+"""
+Helpers shared by Install_tools.py and Update_tools.py.
+
+These run on the interpreter that launched the bootstrap script (not the venv), so only the
+standard library is used here.
+"""
+
+import sys
+import os
+import runpy
+import subprocess
+import shutil
+from collections import deque
+from pathlib import Path
+
+# uv installs with parallel downloads and a shared wheel cache; pip is used when it is not installed or fails.
+UV = shutil.which("uv")
+
+
+# Number of output lines kept per command and shown only if it fails.
+OUTPUT_TAIL_LINES = 200
+
+
+def run(cmd, verbose=False, **kwargs):
+    print(" ".join(map(str, cmd)))
+    if verbose:
+        return subprocess.run(cmd, check=False, **kwargs)
+
+    # Writing every line of a chatty command (pip) to the console is slow on Windows,
+    # so the output is collected and replayed only when it is needed.
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, errors="replace", **kwargs) as proc:
+        for line in proc.stdout:
+            tail.append(line)
+    if proc.returncode != 0:
+        print(f"--- last {len(tail)} lines of output ---")
+        print("".join(tail), end="")
+        print("---")
+    return subprocess.CompletedProcess(cmd, proc.returncode)
+
+def ensure_venv(venv_path: Path):
+    # Checking the interpreter alone is enough to reuse an existing venv.
+    python_path, _ = venv_executables(venv_path)
+    if python_path.is_file():
+        print(f"virtual environment already exists at: {venv_path}")
+        return True
+    return _create_venv(venv_path)
+
+def _create_venv(venv_path: Path):
+    print("Creating a virtual environment for Python...")
+    try:
+        subprocess.run([sys.executable, "-m", "venv", str(venv_path)], check=True)
+    except subprocess.CalledProcessError as e:
+        print("Failed to create virtual environment:", e)
+        return False
+    return True
+
+def venv_executables(venv_path: Path):
+    if os.name == "nt":
+        py = venv_path / "Scripts" / "python.exe"
+        pip = venv_path / "Scripts" / "pip.exe"
+    else:
+        py = venv_path / "bin" / "python"
+        pip = venv_path / "bin" / "pip"
+    return py, pip
+
+def venv_python_or_fallback(venv_path: Path):
+    python_in_venv, _ = venv_executables(venv_path)
+    if not python_in_venv.exists():
+        print(f"Virtualenv python not found at {python_in_venv}. Trying fallback to sys.executable.")
+        python_in_venv = Path(sys.executable)
+    return python_in_venv
+
+def pip_install(python_path: Path, packages, quiet=False):
+    commands = []
+    if UV:
+        commands.append([UV, "pip", "install", "--python", str(python_path)] + packages)
+    # Also the fallback when uv fails (a venv it does not support, an old uv, no cache while offline, ...).
+    # `python -m pip` avoids the extra interpreter launch of the pip.exe shim.
+    commands.append([str(python_path), "-m", "pip", "install", "--disable-pip-version-check", "--no-input"] + packages)
+
+    for cmd in commands:
+        if quiet:
+            # Adding `-q` to pip will reduce the display.
+            cmd.append("-q")
+        res = run(cmd)
+        if res.returncode == 0:
+            return True
+        print(f"{'uv pip' if cmd[0] == UV else 'pip'} install failed for: {packages} (return code {res.returncode})")
+        if cmd is not commands[-1]:
+            print("Retrying with pip...")
+    return False
+
+def pip_wheel(python_path: Path, requirements: Path, wheel_dir: Path):
+    # Downloads (and builds, for sdist-only packages) every wheel without installing anything.
+    # Always pip: uv has no wheel command, so Install_tools.py only takes this path when uv is not installed.
+    cmd = [str(python_path), "-m", "pip", "wheel", "--disable-pip-version-check", "--no-input",
+           "--wheel-dir", str(wheel_dir), "-r", str(requirements)]
+    res = run(cmd)
+    if res.returncode != 0:
+        print(f"pip wheel failed for: {requirements} (return code {res.returncode})")
+        return False
+    return True
+
+def run_download_tools(base: Path, venv_path: Path, python_in_venv: Path):
+    dl_script = base / "download_tools.py"
+    if not dl_script.exists():
+        print("download_tools.py not found; skipping download step.")
+        return
+
+    print("Downloading the necessary tools...")
+    try:
+        # sys.prefix identifies the venv; a resolved venv python would point at the base interpreter.
+        if Path(sys.prefix).resolve() == venv_path.resolve() or python_in_venv == Path(sys.executable):
+            # Already running on the venv interpreter, so skip starting another one.
+            sys.path.insert(0, str(base))
+            # download_tools.py parses its own arguments, so do not hand it ours.
+            argv, sys.argv = sys.argv, [str(dl_script)]
+            try:
+                runpy.run_path(str(dl_script), run_name="__main__")
+            finally:
+                sys.argv = argv
+        else:
+            res = run([str(python_in_venv), str(dl_script)], verbose=True)
+            if res.returncode != 0:
+                print(f"download_tools.py exited with code {res.returncode}")
+    except Exception as e:
+        print("Failed to run download_tools.py:", e)
+
+def copy_fat_ini(base: Path):
+    # copy tools/extract_fat.ini -> tools/TSK-FAT-AutoRecover/
+    src = base / "tools" / "extract_fat.ini"
+    dest_dir = base / "tools" / "TSK-FAT-AutoRecover"
+    if src.exists():
+        try:
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest_file = dest_dir / src.name
+            s = src.stat()
+            try:
+                d = dest_file.stat()
+            except FileNotFoundError:
+                d = None
+            # copy2 preserves mtime, so an earlier copy matches on size and mtime.
+            if d is not None and d.st_size == s.st_size and d.st_mtime >= s.st_mtime:
+                print(f"{dest_file} is up to date (skipping copy)")
+                return
+            shutil.copy2(src, dest_file)
+            print(f"Copied {src} -> {dest_file}")
+        except Exception as e:
+            print("Failed to copy extract_fat.ini:", e)
+    else:
+        print(f"Source INI not found: {src} (skipping copy)")
@@ -1,7 +1,4 @@
-import utils.download as download
 from pathlib import Path
-import shutil
-import subprocess
 import os
 
 TOOL_REPOSITORIES = [
@@ -92,92 +89,233 @@ if os.name == "posix":
     )
 
 if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import io
+    import re
+    import shutil
+    import subprocess
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true", help="Force a full rebuild of the tools compiled from source.")
+    args = parser.parse_args()
+
     root = Path(__file__).resolve().parent / "tools"
 
     if not root.is_dir():
         raise FileNotFoundError("The tools folder that should be there is missing.")
 
-    if os.name == "nt":
-        # sleuthkit
-        output_dir = root / "sleuthkit"
-        res = download.download_latest_github_release(
-            repo_owner="sleuthkit",
-            repo_name="sleuthkit",
-            asset_pattern=r"sleuthkit-.*-win32\.zip$",
-            output_folder=str(output_dir),
-            enable_extract_zip=True,
-            force=False,
-        )
-        print(f"SleuthKit result: {res}")
-        print("=" * 40)
-
-        # rfs_dumper
-        output_dir = root / "rfs_dumper"
-        res = download.download_latest_github_release(
-            repo_owner="usernameak",
-            repo_name="keitai_fs_tools",
-            asset_pattern=r"rfs_dumper_xsr1app\.exe$",
-            output_folder=str(output_dir),
-            enable_extract_zip=False,
-            force=False,
-        )
-        print(f"rfs_dumper result: {res}")
-        print("=" * 40)
-
-        # toshiba_remap
-        output_dir = root / "toshiba_remap"
-        res = download.download_latest_github_release(
-            repo_owner="usernameak",
-            repo_name="keitai_fs_tools",
-            asset_pattern=r"toshiba_remap\.exe$",
-            output_folder=str(output_dir),
-            enable_extract_zip=False,
-            force=False,
-        )
-        print(f"toshiba_remap result: {res}")
-        print("=" * 40)
+    # Resolved once; the full path also saves CreateProcess a PATH search per command on Windows.
+    git_exe = shutil.which("git")
 
+    def git_version():
+        res = subprocess.run([git_exe, "--version"], capture_output=True, text=True)
+        # e.g. "git version 2.39.5" or "git version 2.45.1.windows.1"
+        match = re.search(r"(\d+)\.(\d+)", res.stdout)
+        return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
 
-    def download_github_helper(toolname, repo_owner, ref="main"):
+    # Only the working tree is used, so the history is not fetched.
+    clone_options = ["--depth=1", "--single-branch"]
+    if git_exe and git_version() >= (2, 19):
+        # partial clone
+        clone_options.append("--filter=blob:none")
+
+    def download_release(label, **kwargs):
+        log = io.StringIO()
+        returncode = 0
+        try:
+            # utils.download pulls in requests, which is only needed on the HTTP paths.
+            import utils.download as download
+            if "assets" in kwargs:
+                res = download.download_release_assets(**kwargs, log=lambda message: print(message, file=log))
+            else:
+                res = download.download_latest_github_release(**kwargs, log=lambda message: print(message, file=log))
+            print(f"{label} result: {res}", file=log)
+        except Exception as e:
+            print(f"{label} failed: {e}", file=log)
+            returncode = 1
+        print("=" * 40, file=log)
+        return label, log.getvalue(), returncode
+
+    def download_github_helper(toolname, repo_owner, ref="main", log=print):
+        import utils.download as download
         output_dir = root / toolname
         res = download.download_latest_repo_snapshot(
             repo_owner=repo_owner,
             repo_name=toolname,
             output_folder=str(output_dir),
             enable_extract_zip=True,
-            ref=ref
+            ref=ref,
+            log=log,
         )
-        print(f"{toolname} result: {res}")
-        print("=" * 40)
+        return f"{toolname} result: {res}"
 
-    for repository in TOOL_REPOSITORIES:
+    async def process_repo(repository):
+        # Output is buffered per repository so that parallel runs stay readable.
         tool_path = root / repository["toolname"]
-        print(f"[{tool_path.name}]")
-        if shutil.which("git"):
+        log = io.StringIO()
+        returncode = 0
+        print(f"[{tool_path.name}]", file=log)
+        if git_exe:
+            # gc/maintenance would otherwise be considered (and possibly spawned) after every command.
+            git = [git_exe, "-c", "gc.auto=0", "-c", "maintenance.auto=0"]
+
+            async def run_git(commands, quiet=False):
+                if not quiet:
+                    print(" ".join(commands), file=log)
+                proc = await asyncio.create_subprocess_exec(
+                    *commands, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                )
+                stdout, stderr = await proc.communicate()
+                stdout = stdout.decode("utf-8", errors="replace")
+                if not quiet or proc.returncode != 0:
+                    log.write(stdout)
+                    log.write(stderr.decode("utf-8", errors="replace"))
+                return proc.returncode, stdout
+
             if (tool_path).is_dir():
-                commands = ["git", "reset", "--hard"]
-                print(" ".join(commands))
-                subprocess.run(commands, check=True, cwd=tool_path)
-
-                commands2 = ["git", "pull"]
-                print(" ".join(commands2))
-                subprocess.run(commands2, check=True, cwd=tool_path)
-                print("=" * 40)
+                # Fetching with --depth=1 keeps the shallow history shallow.
+                git += ["-C", str(tool_path)]
+                returncode, _ = await run_git([*git, "fetch", "--depth=1", "origin", repository["ref"]])
+                if returncode == 0:
+                    # The reset rewrites the index and touches every file, so skip it when nothing would change.
+                    _, heads = await run_git([*git, "rev-parse", "HEAD", "FETCH_HEAD"], quiet=True)
+                    _, dirty = await run_git([*git, "status", "--porcelain", "--untracked-files=no"], quiet=True)
+                    heads = heads.split()
+                    if len(heads) == 2 and heads[0] == heads[1] and not dirty:
+                        print("Already up to date.", file=log)
+                    else:
+                        returncode, _ = await run_git([*git, "reset", "--hard", "FETCH_HEAD"])
             else:
-                commands = ["git", "clone", fr"https://github.com/{repository['repo_owner']}/{repository['toolname']}.git"]
-                print(" ".join(commands))
-                subprocess.run(commands, check=True, cwd=root)
-                print("=" * 40)
+                returncode, _ = await run_git(
+                    [*git, "-C", str(root), "clone", *clone_options, "--branch", repository["ref"], fr"https://github.com/{repository['repo_owner']}/{repository['toolname']}.git"],
+                )
         else:
             print(
                 "Git is not found in PATH, using GitHub API. "
-                "Errors may occur if the API rate limit is reached."
+                "Errors may occur if the API rate limit is reached.",
+                file=log,
             )
-            download_github_helper(toolname=repository["toolname"], repo_owner=repository["repo_owner"], ref=repository["ref"])
+            try:
+                res = await asyncio.to_thread(
+                    download_github_helper, toolname=repository["toolname"], repo_owner=repository["repo_owner"], ref=repository["ref"],
+                    log=lambda message: print(message, file=log),
+                )
+                print(res, file=log)
+            except Exception as e:
+                print(f"{repository['toolname']} failed: {e}", file=log)
+                returncode = 1
+        print("=" * 40, file=log)
+        return repository["toolname"], log.getvalue(), returncode
+
+    async def download_all():
+        # Caps the number of simultaneous git processes / HTTP downloads so GitHub is not hammered.
+        semaphore = asyncio.Semaphore(8)
+
+        async def limited(coro):
+            async with semaphore:
+                return await coro
+
+        jobs = []
+        if os.name == "nt":
+            jobs.append(asyncio.to_thread(
+                download_release,
+                "SleuthKit",
+                repo_owner="sleuthkit",
+                repo_name="sleuthkit",
+                asset_pattern=r"sleuthkit-.*-win32\.zip$",
+                output_folder=str(root / "sleuthkit"),
+                enable_extract_zip=True,
+                force=False,
+            ))
+            # Both executables are assets of the same release, so it is queried once.
+            jobs.append(asyncio.to_thread(
+                download_release,
+                "rfs_dumper / toshiba_remap",
+                repo_owner="usernameak",
+                repo_name="keitai_fs_tools",
+                assets=[
+                    (r"rfs_dumper_xsr1app\.exe$", str(root / "rfs_dumper"), False),
+                    (r"toshiba_remap\.exe$", str(root / "toshiba_remap"), False),
+                ],
+                force=False,
+            ))
+
+        jobs += [process_repo(repository) for repository in TOOL_REPOSITORIES]
+
+        failed = []
+        for job in asyncio.as_completed([limited(job) for job in jobs]):
+            name, log, returncode = await job
+            print(log, end="")
+            if returncode != 0:
+                failed.append(name)
+        return failed
+
+    failed = asyncio.run(download_all())
+    if failed:
+        raise Exception(f"Failed to download: {', '.join(failed)}")
 
     # compile
     if os.name == "posix":
-        commands = ["dub", "build", "--force"]
-        subprocess.run(commands, check=True, cwd=os.path.join(root, "keitai_fs_tools", "xsr1"))
-        
+        import hashlib
+        import json
+
+        fs_tools_dir = root / "keitai_fs_tools"
+        xsr1_dir = fs_tools_dir / "xsr1"
+        xsr1_binary = xsr1_dir / "xsr1app" / "rfs_dumper_xsr1app"
+        # What the binary was built from; kept next to the sources. It survives `git reset`, but a snapshot update removes xsr1/ with it, which forces a rebuild.
+        stamp_path = xsr1_dir / ".keitaifsextractor_build.json"
+        build_type = "release"
 
+        def fetched_revision():
+            if git_exe and (fs_tools_dir / ".git").exists():
+                res = subprocess.run([git_exe, "-C", str(fs_tools_dir), "rev-parse", "HEAD"], capture_output=True, text=True)
+                if res.returncode == 0:
+                    return res.stdout.strip()
+            # downloaded through the GitHub API
+            try:
+                with open(fs_tools_dir / "manifest.json", encoding="utf-8") as fh:
+                    return json.load(fh).get("commit_sha")
+            except (OSError, ValueError):
+                return None
+
+        def dub_files_digest():
+            # dub.json / dub.sdl / dub.selections.json of every package in the repository, so a changed
+            # dependency (or a changed version pin) also triggers a rebuild
+            h = hashlib.sha256()
+            for p in sorted(fs_tools_dir.rglob("dub.*")):
+                if p.is_file() and ".dub" not in p.parts and ".git" not in p.parts:
+                    h.update(p.relative_to(fs_tools_dir).as_posix().encode() + b"\0")
+                    h.update(p.read_bytes())
+            return h.hexdigest()
+
+        def sources_newer_than(binary):
+            # local edits that are not in a fetched revision
+            built = binary.stat().st_mtime
+            return any(
+                p.stat().st_mtime > built
+                for p in fs_tools_dir.rglob("*.d")
+                if ".dub" not in p.parts and ".git" not in p.parts
+            )
+
+        stamp = {"revision": fetched_revision(), "build_type": build_type, "dub_files": dub_files_digest()}
+        try:
+            with open(stamp_path, encoding="utf-8") as fh:
+                old_stamp = json.load(fh)
+        except (OSError, ValueError):
+            old_stamp = None
+
+        commands = None
+        if args.rebuild or not xsr1_binary.is_file() or old_stamp != stamp:
+            # An update (or a different build type) rebuilds everything, dependencies included.
+            commands = ["dub", "build", "-b", build_type, "--force"]
+        elif sources_newer_than(xsr1_binary):
+            # dub itself skips up-to-date targets, so --force is not needed.
+            commands = ["dub", "build", "-b", build_type]
+
+        if commands is None:
+            print(f"{xsr1_binary.name} is up to date (use --rebuild to force).")
+        else:
+            subprocess.run(commands, check=True, cwd=xsr1_dir)
+            with open(stamp_path, "w", encoding="utf-8") as fh:
+                json.dump(stamp, fh, indent=2)
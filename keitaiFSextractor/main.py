@@ -1,26 +1,45 @@
 from utils import call_tools
 import csv
 import argparse
+import atexit
+import heapq
+import io
 import os
 import shutil
 import re
+import subprocess
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 
+if sys.platform.startswith("linux"):
+    import fcntl
 
-def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize_7z=False):
+
+def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize_7z=False, model_by_norm=None, jobs=None):
+    """Returns {FTL output file name: exception} for the FTL outputs whose file system could not be extracted."""
+    # Taken once so that both archives get the same date even if the run crosses midnight.
+    run_date = datetime.now().strftime('%Y%m%d')
     input_dir = os.path.dirname(input_files[0])
     input_filename = os.path.basename(input_files[0])
+    input_filename_lower = input_filename.lower()
+    input_stem = os.path.splitext(input_filename)[0]
 
     # detect the model infomation
+    if model_by_norm is None:
+        model_by_norm = index_model_infos(model_infos)
     if model_name is None:
-        model_info = detect_model_info(input_files[0], model_infos)
+        model_info = detect_model_info(input_files[0], model_by_norm)
     else:
-        model_info = next((m for m in model_infos if to_ktdumper_modelname(m["Phone_Model"].strip()) == to_ktdumper_modelname(model_name)), None)
+        model_info = model_by_norm.get(to_ktdumper_modelname(model_name))
 
     if model_info is None:
         raise Exception(f"No matching model found.")
 
-    print(f"Detected: {model_info['Phone_Model']}")
+    print(f"Detected: {model_info.Phone_Model}")
 
     model_name = read_model_info("Phone_Model", model_info)
     service = read_model_info("Service", model_info)
@@ -34,17 +53,20 @@ def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize
     storage_type = read_model_info("Storage_Type", model_info)
     chip_name = read_model_info("Chip_Name", model_info)
     media_type = read_model_info("Media_Type", model_info)
+
+    if jobs is None:
+        jobs = default_jobs(fs_inner_parallelism(filesystem, fs_parameter, storage_type))
                    
     if ftl is None and filesystem is None:
         raise ValueError(f"The FTL and filesystem of this {model_name} are currently under investigation.")
     
     print(f"Input files: {[os.path.basename(f) for f in input_files]}")
     if storage_type is not None:
-         temp = "⭕️" if storage_type.lower() in os.path.basename(input_filename).lower() else "❌️"
+         temp = "⭕️" if storage_type.lower() in input_filename_lower else "❌️"
          print(f"User Data Storage Type: {storage_type} (Included in the filename?: {temp}).")
 
     if chip_name is not None:
-         temp = "⭕️" if chip_name.lower() in os.path.basename(input_filename).lower() else "❌️"
+         temp = "⭕️" if chip_name.lower() in input_filename_lower else "❌️"
          print(f"Chip Name: {chip_name} (Included in the filename?: {temp})).")
 
     if not skip_confirm:
@@ -52,7 +74,7 @@ def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize
         input("If there are no mistakes, press Enter.")
 
     # get OOB files
-    if os.path.basename(input_filename) == "nand_mixed.bin":
+    if input_filename == "nand_mixed.bin":
         print("\nSeparating NAND and OOB...")
         out_nand = os.path.join(input_dir, "nand.bin")
         out_oob = os.path.join(input_dir, "nand.oob")
@@ -70,13 +92,17 @@ def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize
     print("Input files:", input_files)
     print("Input OOB files:", input_oobs)
 
+    # output folders
+    out_ftl_dir = os.path.join(input_dir, "ftl_remapped") if ftl is not None else None
+    out_fs_dir = os.path.join(input_dir, "fs_extracted")
+    out_collected_dir = os.path.join(input_dir, "collected_files")
+    out_media_dir = os.path.join(out_collected_dir, "media")
+    ensure_dirs([d for d in (out_ftl_dir, out_fs_dir, out_media_dir) if d is not None])
+
     # FTL processing
-    out_ftl_dir = None
     if ftl is not None:
         print("=" * 50, "\nRemapping the FTL...")
         print(f"FTL: {ftl}")
-        out_ftl_dir = os.path.join(input_dir, "ftl_remapped")
-        os.makedirs(out_ftl_dir, exist_ok=True)
         convert_ftl(input_files, input_oobs, ftl, out_ftl_dir, ftl_parameter)
         print("done.")
 
@@ -85,76 +111,69 @@ def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize
     # fs_extracted / Folder per FTL output file / Folder per FS partition
     print("=" * 50, "\nExtracting the file system...")
     print(f"File System: {filesystem}")
-    out_fs_dir = os.path.join(input_dir, "fs_extracted")
-    os.makedirs(out_fs_dir, exist_ok=True)
 
+    failed = {}
     if ftl is None:
         convert_fs(
             input_files=input_files,
             input_oobs=input_oobs,
             fs_type=filesystem,
             fs_parameter=fs_parameter,
-            out_dir=os.path.join(out_fs_dir, f"00_{os.path.splitext(input_filename)[0]}"),
+            out_dir=os.path.join(out_fs_dir, f"00_{input_stem}"),
             model_name=model_name, storage_type=storage_type,
         )
     else:
-        ftlfiles = [entry for entry in os.scandir(out_ftl_dir) if entry.is_file()]
+        with os.scandir(out_ftl_dir) as it:
+            # The size is read once per entry (DirEntry.stat() is not cached from the listing on every OS).
+            ftlfiles = [(entry.stat().st_size, entry.name) for entry in it if entry.is_file()]
         # The number of FTL files output may become extremely large due to individual files unrelated to FAT, so limit the number of files.
-        for e in sorted(ftlfiles, key=lambda e: e.stat().st_size, reverse=True)[:10]:
-            f = e.name
-            print(f"\n[{f}]")
-            convert_fs(
-                input_files=[os.path.join(out_ftl_dir, f)],
-                input_oobs=[None],
-                fs_type=filesystem,
-                fs_parameter=fs_parameter,
-                out_dir=os.path.join(out_fs_dir, os.path.splitext(f)[0]),
-                model_name=model_name, storage_type=storage_type,
-            )
-
-    print("done.")
+        ftlfiles = [name for _, name in heapq.nlargest(10, ftlfiles, key=lambda t: t[0])]
+        # Each file is extracted independently by external tools, so they are processed side by side.
+        # The handlers' own thread pools share the CPUs that are left to each worker.
+        workers = max(1, min(len(ftlfiles), jobs))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_set_inner_workers, initargs=(max(1, (os.cpu_count() or 1) // workers),),
+        ) as executor:
+            futures = {}
+            for f in ftlfiles:
+                futures[f] = executor.submit(
+                    _convert_ftl_output, f,
+                    input_files=[os.path.join(out_ftl_dir, f)],
+                    input_oobs=[None],
+                    fs_type=filesystem,
+                    fs_parameter=fs_parameter,
+                    out_dir=os.path.join(out_fs_dir, os.path.splitext(f)[0]),
+                    model_name=model_name, storage_type=storage_type,
+                )
+            # Some of the files are unrelated to the file system, so a tool rejecting one does not stop the others.
+            # Anything else (a missing handler, a broken pool, ...) is not specific to one file and ends the run.
+            for f, future in futures.items():
+                try:
+                    future.result()
+                except _EXTRACTION_ERRORS as e:
+                    print(f"[{f}] failed: {e!r}")
+                    failed[f] = e
+            if futures and len(failed) == len(futures):
+                raise Exception(f"The file system could not be extracted from any FTL output: {', '.join(failed)}")
+
+    print(f"done ({len(failed)} failed)." if failed else "done.")
 
     # collecting processing
     print("=" * 50, "\nCollecting the necessary files...")
-    out_collected_dir = os.path.join(input_dir, "collected_files")
-    fs_roots = [
-        os.path.join(out_fs_dir, second, third)
-        for second in os.listdir(out_fs_dir)
-        if os.path.isdir(os.path.join(out_fs_dir, second))
-        for third in os.listdir(os.path.join(out_fs_dir, second))
-        if os.path.isdir(os.path.join(out_fs_dir, second, third))
-    ]
-
-    print("Starting the Java folder search...")
-    if java_path is None:
-        print("Skipped. The java_path is missing from the CSV.")
-    else:
-        collected_java_dir = os.path.join(out_collected_dir, "java")
-        os.makedirs(collected_java_dir, exist_ok=True)
-
-        out_java = None
-        if java_type == "fs_path":
-            for fs_root in fs_roots:
-                if (p := find_case_insensitive(fs_root, java_path)):
-                    print(f"Found: {p}")
-                    out_java = os.path.join(collected_java_dir, os.path.basename(java_path))
-                    shutil.copytree(p, out_java, dirs_exist_ok=True)
-                    break
-            else:
-                raise ValueError(f"The Java folder could not be obtained, CSV's value: {java_path}")
-        else:
-            print("Skipped.")
-
-        output_java_dir = None
-        if java_tool == "keitai-tools":
-            print("\nUsing keitai-tools to convert Java files for the emulator...")
-            call_tools.run_keitai_tools(input=out_java)
-            output_java_dir = os.path.join(collected_java_dir, "output")
-
-
-    print("\nCollecting media files...")
-    out_media_dir = os.path.join(out_collected_dir, "media")
-    os.makedirs(out_media_dir, exist_ok=True)
+    # scandir returns the entry type with the listing, so no extra stat per entry is needed.
+    # fs root -> names of its top-level folders; listed here once, so the Java and orphan
+    # searches below only look names up instead of each going back to the disk for every root.
+    fs_roots = {}
+    with os.scandir(out_fs_dir) as seconds:
+        for second in seconds:
+            if not second.is_dir():
+                continue
+            with os.scandir(second.path) as thirds:
+                for third in thirds:
+                    if third.is_dir():
+                        with os.scandir(third.path) as it:
+                            fs_roots[third.path] = [e.name for e in it if e.is_dir()]
 
     if service in ["FOMA", "mova"]:
         profile = "docomo"
@@ -167,6 +186,112 @@ def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize
     else:
         raise ValueError(service)
 
+    # If the 7z file already exists, 7-Zip throw an error.
+    # Removed straight from the listing; deleting an entry does not disturb the ongoing scandir.
+    with os.scandir(out_collected_dir) as it:
+        for e in it:
+            if e.is_file() and _SEVENZ_RE.search(e.name):
+                os.unlink(e.path)
+
+    # Java first, on its own: a Java folder that cannot be found stops the run before anything else starts,
+    # and its messages are not mixed with the others.
+    output_java_dir = collect_java(java_path, java_type, java_tool, fs_roots, out_collected_dir)
+
+    # The rest only reads the extracted file systems and writes to its own folders, so it overlaps:
+    # each archive starts as soon as its input is ready.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        compress_futures = []
+        if output_java_dir and os.listdir(output_java_dir):
+            out_java_7zname = f"{run_date}_{model_name}_javaout"
+
+            print("\nCompressing the Java files with 7-Zip...")
+            compress_futures.append(executor.submit(
+                call_tools.run_7zip,
+                input=os.path.join(output_java_dir, "*"),
+                output=os.path.join(out_collected_dir, out_java_7zname),
+                fullsize_7z=fullsize_7z,
+                threads=os.cpu_count(),
+            ))
+
+        # The media tools write to the console, so the orphan copy's messages are held back until they are done.
+        orphan_log = io.StringIO()
+        orphan_future = executor.submit(collect_orphans, fs_roots, out_collected_dir, log=orphan_log)
+
+        collect_media(media_type, out_ftl_dir, out_fs_dir, fs_roots, out_media_dir, out_collected_dir, profile)
+        # media 7z
+        if os.listdir(out_media_dir):
+            out_media_7zname = f"{run_date}_{model_name}_media"
+
+            print("\nCompressing the media files with 7-Zip...")
+            compress_futures.append(executor.submit(
+                call_tools.run_7zip,
+                input=os.path.join(out_media_dir, "*"),
+                output=os.path.join(out_collected_dir, out_media_7zname),
+                fullsize_7z=fullsize_7z,
+                # Media files are already compressed, so a high level costs time without making the archive smaller.
+                level=1,
+                threads=os.cpu_count(),
+            ))
+
+        try:
+            orphan_future.result()
+        finally:
+            print(orphan_log.getvalue(), end="")
+        for future in compress_futures:
+            future.result()
+
+    print("=" * 50, f"\nProcessing is complete. => {out_collected_dir}")
+    if failed:
+        print(f"Warning: the file system could not be extracted from {len(failed)} of {len(ftlfiles)} FTL output files:")
+        for f, e in failed.items():
+            print(f"  {f}: {e!r}")
+    return failed
+
+
+def collect_java(java_path, java_type, java_tool, fs_roots, out_collected_dir):
+    """Copy the Java folder out of the file systems and convert it; returns the keitai-tools output folder (or None).
+
+    fs_roots maps each file system root to the names of its top-level folders.
+    """
+    print("Starting the Java folder search...")
+    if java_path is None:
+        print("Skipped. The java_path is missing from the CSV.")
+        return None
+
+    collected_java_dir = os.path.join(out_collected_dir, "java")
+    os.makedirs(collected_java_dir, exist_ok=True)
+
+    out_java = None
+    if java_type == "fs_path":
+        # Only the roots whose top level holds the first path component are searched further.
+        first, _, rest = java_path.replace("\\", os.sep).partition(os.sep)
+        for fs_root, top_dirs in fs_roots.items():
+            top = next((name for name in top_dirs if name.lower() == first.lower()), None)
+            if top is None:
+                continue
+            p = os.path.join(fs_root, top)
+            if rest:
+                p = find_case_insensitive(p, rest)
+            if p:
+                print(f"Found: {p}")
+                out_java = os.path.join(collected_java_dir, os.path.basename(java_path))
+                fast_copytree(p, out_java)
+                break
+        else:
+            raise ValueError(f"The Java folder could not be obtained, CSV's value: {java_path}")
+    else:
+        print("Skipped.")
+
+    output_java_dir = None
+    if java_tool == "keitai-tools":
+        print("\nUsing keitai-tools to convert Java files for the emulator...")
+        call_tools.run_keitai_tools(input=out_java)
+        output_java_dir = os.path.join(collected_java_dir, "output")
+    return output_java_dir
+
+
+def collect_media(media_type, out_ftl_dir, out_fs_dir, fs_roots, out_media_dir, out_collected_dir, profile):
+    print("\nCollecting media files...")
     extract_media(media_type, out_ftl_dir, out_fs_dir, fs_roots, out_media_dir, profile)
 
     # Duplicate Removal and Renaming of MLD Files
@@ -175,65 +300,111 @@ def main(input_files, model_infos, skip_confirm=False, model_name=None, fullsize
             input=os.path.join(out_media_dir, "MLD_files"),
             output=os.path.join(out_media_dir, "temp"),
         )
-        shutil.rmtree(os.path.join(out_media_dir, "MLD_files"))
-        os.rename(
+        # The originals are swapped out (outside the media folder, which gets archived) and deleted in the background.
+        old_mld_dir = os.path.join(out_collected_dir, "MLD_files.old")
+        if os.path.exists(old_mld_dir):
+            shutil.rmtree(old_mld_dir)
+        os.replace(os.path.join(out_media_dir, "MLD_files"), old_mld_dir)
+        os.replace(
             os.path.join(out_media_dir, "temp"),
             os.path.join(out_media_dir, "MLD_files")
         )
+        # Non-daemon, so the interpreter waits for it before exiting.
+        threading.Thread(target=shutil.rmtree, args=(old_mld_dir,)).start()
 
-    print("\nCollecting files which are orphaned from the file system....")
+
+def collect_orphans(fs_roots, out_collected_dir, log=None):
+    print("\nCollecting files which are orphaned from the file system....", file=log)
     out_orphan_dir = os.path.join(out_collected_dir, "OrphanFiles")
-    for fs_root in fs_roots:
-        candidate_path = os.path.join(fs_root, "$OrphanFiles")
-        if os.path.isdir(candidate_path):
-            shutil.copytree(candidate_path, out_orphan_dir, dirs_exist_ok=True)
+    for fs_root, top_dirs in fs_roots.items():
+        if "$OrphanFiles" in top_dirs:
+            fast_copytree(os.path.join(fs_root, "$OrphanFiles"), out_orphan_dir)
 
 
-    print("\nCompressing with 7-Zip...")
-    # If the 7z file already exists, 7-Zip throw an error.
-    for f in [
-        f for f
-        in os.listdir(out_collected_dir)
-        if (os.path.isfile(os.path.join(out_collected_dir, f))
-            and re.search(r"(\.7z\.\d\d\d|\.7z$)", f)
-        )
-    ]:
-        os.remove(os.path.join(out_collected_dir, f))
-    
-    # java 7z
-    if output_java_dir and os.listdir(output_java_dir):
-        out_java_7zname = f"{datetime.now().strftime('%Y%m%d')}_{model_name}_javaout"
-
-        call_tools.run_7zip(
-            input=os.path.join(output_java_dir, "*"),
-            output=os.path.join(out_collected_dir, out_java_7zname),
-            fullsize_7z=fullsize_7z,
-        )
+def default_jobs(inner_parallelism=1):
+    """Number of FTL output files extracted at the same time; each of them runs inner_parallelism tools at once."""
+    # Several extractions reading big dumps at once can thrash a HDD, so stay at 4 at most.
+    return max(1, min(4, (os.cpu_count() or 1) // inner_parallelism))
 
-    # media 7z
-    if os.listdir(out_media_dir):
-        out_media_7zname = f"{datetime.now().strftime('%Y%m%d')}_{model_name}_media"
 
-        call_tools.run_7zip(
-            input=os.path.join(out_media_dir, "*"),
-            output=os.path.join(out_collected_dir, out_media_7zname),
-            fullsize_7z=fullsize_7z,
-        )
-    
-    print("=" * 50, f"\nProcessing is complete. => {out_collected_dir}")
+def fs_inner_parallelism(filesystem, fs_parameter, storage_type):
+    """How many tools a file system handler runs side by side for one input, where that is known up front."""
+    if filesystem == "ext3" and fs_parameter:
+        return len(fs_parameter.split(","))
+    if filesystem == "YAFFS2" and storage_type:
+        return len(storage_type.split(","))
+    return 1
+
+
+# Set in the ProcessPoolExecutor workers of main(): the CPUs each worker's own thread pools may use.
+_inner_workers = None
+
+
+def _set_inner_workers(n):
+    global _inner_workers
+    _inner_workers = n
+
+
+def inner_workers(tasks):
+    """Threads for a handler's pool of `tasks` independent jobs; capped when several handlers run at once."""
+    if _inner_workers is None:
+        return max(1, tasks)
+    return max(1, min(tasks, _inner_workers))
+
+
+def pause(message):
+    try:
+        input(message)
+    except (KeyboardInterrupt, EOFError):
+        pass
 
 
 def read_model_info(key, model_info):
-    stripped = model_info[key].strip()
+    stripped = getattr(model_info, key).strip()
     return None if stripped in ["", "-"] else stripped
 
 
+# What an extraction tool raises for an input it cannot handle. A missing tool or venv is a setup error and ends the run.
+_EXTRACTION_ERRORS = (subprocess.CalledProcessError,)
+
+_II_RE = re.compile(r"ii$")
+# e.g. 20250926_P902i_media.7z, 20250926_P902i_media.7z.001 (7-Zip goes past .999 with more digits)
+_SEVENZ_RE = re.compile(r"\.7z(?:\.\d{3,})?$")
+
+
+@lru_cache(maxsize=4096)
 def to_ktdumper_modelname(model_name):
     model_name = model_name.replace("μ", "u").replace("+", "p").lower()
-    model_name = re.sub(r"ii$", "2", model_name)
+    model_name = _II_RE.sub("2", model_name)
     return model_name
 
 
+@lru_cache(maxsize=None)
+def load_model_infos(csv_path):
+    # The file is small, so it is read in one go and parsed from memory.
+    # The result is an immutable tuple, so it is cached for callers that load it more than once.
+    with open(csv_path, encoding="utf8", newline="") as inf:
+        data = inf.read()
+    reader = csv.reader(io.StringIO(data, newline=""))
+    # One namedtuple per row (fields named after the CSV header) is lighter than a dict per row.
+    Model = namedtuple("Model", next(reader))
+    n = len(Model._fields)
+    # Like DictReader: blank lines are skipped and a short row gets empty fields (read_model_info gives None for them).
+    return tuple(Model._make((row + [""] * n)[:n]) for row in reader if row)
+
+
+def index_model_infos(model_infos):
+    model_by_norm = {}
+    for m in model_infos:
+        name = to_ktdumper_modelname(m.Phone_Model.strip())
+        # detect_model_info looks at every folder up to the root and relies on this to skip the generic ones
+        if name and not any(c.isdigit() for c in name):
+            raise ValueError(f"Model name without a digit in models.csv: {m.Phone_Model!r}")
+        # The first row wins on duplicates, as with a linear search.
+        model_by_norm.setdefault(name, m)
+    return model_by_norm
+
+
 # e.g. KTdumper_2025-09-26_08-37-38_p902i_dump_nand
 def parse_ktfolder(folder_name):
     parts = folder_name.split("_")
@@ -258,215 +429,436 @@ def find_case_insensitive(root, target_path):
     
     return current
 
-def convert_ftl(input_files, input_oobs, ftl_type, out_dir, ftl_parameter):
-    match ftl_type:
-        case "SH/D904i FTL":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-            
-            call_tools.remap_sh_d904i(
-                in_nand=input_files[0],
-                in_oob=input_oobs[0],
-                output=os.path.join(out_dir, "remapped.bin"),
-            )
-        case "B4B4 FTL":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-            
-            call_tools.remap_b4b4(
-                in_nand=input_files[0],
-                in_oob=input_oobs[0],
-                output=out_dir,
-            )
-        case "Fugue NAND":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-
-            call_tools.remap_fugue(
-                in_nands=[input_files[0]],
-                in_oobs=[input_oobs[0]],
-                output=os.path.join(out_dir, "remapped.bin"),
-                ftl_parameter=ftl_parameter,
-            )
-        case "Fugue NAND (A+B)":
-            if len(input_files) < 2: raise FileNotFoundError("The second NAND file is required as the second argument.")
-            if None in [input_oobs[0], input_oobs[1]]: raise FileNotFoundError("OOB file is missing.")
-
-            call_tools.remap_fugue(
-                in_nands=[input_files[0], input_files[1]],
-                in_oobs=[input_oobs[0], input_oobs[1]],
-                output=os.path.join(out_dir, "remapped.bin"),
-                ftl_parameter=ftl_parameter,
-            )
-        case "SSR200":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+def ensure_dirs(paths):
+    # Sorted so that parents come first; the later calls then find them already there instead of walking up the path.
+    for path in sorted(set(paths)):
+        os.makedirs(path, exist_ok=True)
+
+
+# Linux ioctl that makes dst share src's data blocks (Btrfs, XFS, ...).
+_FICLONE = 0x40049409
+
+
+def _copy_in_kernel(fsrc, fdst):
+    # A reflink first (copy-on-write filesystems copy no data), otherwise copy_file_range,
+    # which copies inside the kernel without passing the data through Python buffers.
+    try:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return
+    except OSError:
+        pass
+    size = os.fstat(fsrc.fileno()).st_size
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - offset, offset, offset)
+        if copied == 0:
+            # The source shrank, or the filesystem (some FUSE mounts) gave up early:
+            # the rest is copied the ordinary way instead of leaving dst truncated.
+            fsrc.seek(offset)
+            fdst.seek(offset)
+            shutil.copyfileobj(fsrc, fdst)
+            break
+        offset += copied
 
-            call_tools.remap_ssr200(
-                in_nand=input_files[0],
-                in_oob=input_oobs[0],
-                output=os.path.join(out_dir, "remapped.bin"),
-            )
-        case "SSR200 (old flavor)":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-            
-            call_tools.remap_old_ssr200(
-                in_nand=input_files[0],
-                in_oob=input_oobs[0],
-                output=os.path.join(out_dir, "remapped.bin"),
-            )
-        case "XSR1":
-            call_tools.remap_xsr1(
-                in_nand=input_files[0],
-                output=os.path.join(out_dir, "remapped.bin"),
-            )
-        case "XSR2":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-            
-            call_tools.remap_xsr2(
-                in_nand=input_files[0],
-                in_oob=input_oobs[0],
-                output=out_dir,
-            )
-        case "XSR3":
-            raise NotImplementedError("This tool is still a work in progress.")
-        case "FSR_F":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-            if ftl_parameter is None: raise ValueError("partition parameter is missing.")
-            
-            print("This process will take about 5 minutes...")
-            call_tools.remap_fsr_f(
-                partition=ftl_parameter,
-                in_nand=input_files[0],
-                in_oob=input_oobs[0],
-                output=os.path.join(out_dir, "remapped.bin"),
-            )
-        case "FSR_ll":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-            
-            print("This process will take about 10 minutes...")
-            call_tools.remap_fsr_ll(
-                in_nand=input_files[0],
-                in_oob=input_oobs[0],
-                output=os.path.join(out_dir, "remapped.bin"),
-            )
-        case "F900i FTL":
-            raise NotImplementedError("This tool is still a work in progress.")
-        case "FlashFX 3.00 NOR":
+
+def copy_file(src, dst):
+    """Same as shutil.copy2, but on Linux the data is copied by the kernel (a reflink where possible)."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                _copy_in_kernel(fsrc, fdst)
+        except (OSError, AttributeError):  # AttributeError: no os.copy_file_range in this build
             pass
-        case "00F0F0 Structure":
-            call_tools.remap_f0(
-                in_nand=input_files[0],
-                output=out_dir,
-                ftl_parameter=ftl_parameter,
-            )
-        case "SH900i FTL":
-            call_tools.remap_sh900i(
-                in_nand=input_files[0],
-                output=out_dir,
-                ftl_parameter=ftl_parameter,
-            )
-        case _:
-            raise NotImplementedError(f"Unsupported FTL: {ftl_type}")
-        
+        else:
+            # The timestamps are kept; they matter for a forensic copy.
+            shutil.copystat(src, dst)
+            return dst
+    return shutil.copy2(src, dst)
+
+
+def fast_copytree(src, dst):
+    """Same as shutil.copytree(src, dst, dirs_exist_ok=True), but the files are copied in parallel."""
+    # The folders are mostly many small files, so the time goes to per-file open/stat/close rather than to bytes.
+    copied_dirs = []
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        futures = []
+        stack = [(src, dst)]
+        while stack:
+            src_dir, dst_dir = stack.pop()
+            os.makedirs(dst_dir, exist_ok=True)
+            copied_dirs.append((src_dir, dst_dir))
+            with os.scandir(src_dir) as it:
+                for entry in it:
+                    target = os.path.join(dst_dir, entry.name)
+                    if entry.is_dir():
+                        stack.append((entry.path, target))
+                    else:
+                        futures.append(executor.submit(copy_file, entry.path, target))
+        for future in futures:
+            future.result()
+
+    # Like copytree, the folder timestamps are copied last, once nothing is written into them anymore.
+    for src_dir, dst_dir in reversed(copied_dirs):
+        shutil.copystat(src_dir, dst_dir)
+
+
+def merge_tree(src, dst, suffix):
+    """
+    Move the contents of src into dst. Folders present on both sides are merged; any other entry whose name
+    is already taken in dst gets `suffix` (and a counter, if that name is taken too) added to its name.
+    """
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as it:
+        for entry in it:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir(follow_symlinks=False) and os.path.isdir(target) and not os.path.islink(target):
+                merge_tree(entry.path, target, suffix)
+                continue
+            if os.path.lexists(target):
+                target = _free_name(dst, entry.name, suffix)
+            os.replace(entry.path, target)
+
+
+def _free_name(folder, name, suffix):
+    stem, ext = os.path.splitext(name)
+    target = os.path.join(folder, f"{stem}{suffix}{ext}")
+    n = 1
+    # os.replace would silently overwrite a file left there by an earlier merge
+    while os.path.lexists(target):
+        n += 1
+        target = os.path.join(folder, f"{stem}{suffix}_{n}{ext}")
+    return target
+
+
+def convert_ftl(input_files, input_oobs, ftl_type, out_dir, ftl_parameter):
+    handler = _FTL_HANDLERS.get(ftl_type)
+    if handler is None:
+        raise NotImplementedError(f"Unsupported FTL: {ftl_type}")
+    handler(input_files, input_oobs, out_dir, ftl_parameter)
+
+
+def _convert_ftl_output(name, **kwargs):
+    # Printed by the worker when it starts, so the header comes right before this file's tool output.
+    print(f"\n[{name}]", flush=True)
+    convert_fs(**kwargs)
+
 
 def convert_fs(input_files, input_oobs, fs_type, fs_parameter, out_dir, model_name, storage_type):
-    match fs_type:
-        case "FAT" | "FAT12"| "FAT16" | "FAT32" | "Samsung RFS" | "KFAT":
-            call_tools.extract_fat(
-                input=input_files[0],
-                output=out_dir
-            )
-        case "Customized FAT16":
-            temp_dir = os.path.join(out_dir, "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            call_tools.carve_fat(
-                input=input_files[0],
-                output=temp_dir
-            )
+    handler = _FS_HANDLERS.get(fs_type)
+    if handler is None:
+        raise NotImplementedError(f"Unsupport filesystem: {fs_type}")
+    handler(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type)
 
-            standard_fats = []
-            for i, f in enumerate(sorted([e.path for e in os.scandir(temp_dir) if e.is_file()])):
-                out_conv = os.path.join(out_dir, f"{i:02}_converted_fat.img")
-                call_tools.convert_customized_fat16(
-                    input=f,
-                    output=out_conv,
-                )
-                standard_fats.append(out_conv)
-                os.remove(f)
 
-            for f in standard_fats:
-                extdir = os.path.join(out_dir, os.path.splitext(os.path.basename(f))[0] + "_extracted")
-                os.makedirs(extdir, exist_ok=True)
+def _ftl_sh_d904i(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+    
+    call_tools.remap_sh_d904i(
+        in_nand=input_files[0],
+        in_oob=input_oobs[0],
+        output=os.path.join(out_dir, "remapped.bin"),
+    )
 
-                # Extract it to a temp folder and then move it to delete the top folder.
-                call_tools.extract_fat(f, temp_dir)
-                for e in os.scandir(temp_dir):
-                    for e2 in os.scandir(e.path):
-                        shutil.move(e2.path, extdir)
-                    shutil.rmtree(e.path)
-            
-            shutil.rmtree(temp_dir)
-        case "JFFS2":
-            print("Processing may take several minutes...")
-            os.makedirs(out_dir, exist_ok=True)
-            carved_jffs2_dir = os.path.join(out_dir, "00_JFFS2_extracted")
-            call_tools.extract_jffs2(
-                input=input_files[0],
-                output=carved_jffs2_dir,
-            )
-        case "YAFFS2":
-            if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
-            if storage_type is None: raise ValueError("Storage_Type is required.")
 
-            storage_types = [t.strip() for t in storage_type.split(",")]
-            if len(input_files) < len(storage_types): raise FileNotFoundError(f"Not enough input files ({len(storage_types)} required)")
+def _ftl_b4b4(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+    
+    call_tools.remap_b4b4(
+        in_nand=input_files[0],
+        in_oob=input_oobs[0],
+        output=out_dir,
+    )
+
 
-            for i, t in enumerate(storage_types):
-                y_model_name = model_name.lower().replace("-", "")
+def _ftl_fugue(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
 
-                if t.lower() == "onenand":
-                    config_name = f"config_{y_model_name}.json"
-                else:
-                    config_name = f"config_{y_model_name}_{t.lower()}.json"
+    call_tools.remap_fugue(
+        in_nands=[input_files[0]],
+        in_oobs=[input_oobs[0]],
+        output=os.path.join(out_dir, "remapped.bin"),
+        ftl_parameter=ftl_parameter,
+    )
 
-                y_outdir = os.path.join(os.path.dirname(out_dir), f"{i:02}_{os.path.splitext(os.path.basename(input_files[i]))[0]}")
 
-                call_tools.extract_yaffs2(
-                    in_nand=input_files[i],
-                    in_oob=input_oobs[i],
-                    output=y_outdir,
-                    config_name=config_name,
-                )
-        case "ext3":
-            if fs_parameter is None: raise ValueError("The FS Parameter is not defined")
-
-            offsets = [int(par.strip(), 16) for par in fs_parameter.split(",")]
-            for i, offset in enumerate(offsets):
-                ext_outdir = os.path.join(out_dir, f"{i:02}_EXT3_0x{offset:09X}_extracted")
-                call_tools.extract_ext3(
-                    input=input_files[0],
-                    output=ext_outdir,
-                    offset=offset,
-                )
-        case "Qualcomm EFS2":
+def _ftl_fugue_ab(input_files, input_oobs, out_dir, ftl_parameter):
+    if len(input_files) < 2: raise FileNotFoundError("The second NAND file is required as the second argument.")
+    if None in [input_oobs[0], input_oobs[1]]: raise FileNotFoundError("OOB file is missing.")
+
+    call_tools.remap_fugue(
+        in_nands=[input_files[0], input_files[1]],
+        in_oobs=[input_oobs[0], input_oobs[1]],
+        output=os.path.join(out_dir, "remapped.bin"),
+        ftl_parameter=ftl_parameter,
+    )
+
+
+def _ftl_ssr200(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+
+    call_tools.remap_ssr200(
+        in_nand=input_files[0],
+        in_oob=input_oobs[0],
+        output=os.path.join(out_dir, "remapped.bin"),
+    )
+
+
+def _ftl_old_ssr200(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+    
+    call_tools.remap_old_ssr200(
+        in_nand=input_files[0],
+        in_oob=input_oobs[0],
+        output=os.path.join(out_dir, "remapped.bin"),
+    )
+
+
+def _ftl_xsr1(input_files, input_oobs, out_dir, ftl_parameter):
+    call_tools.remap_xsr1(
+        in_nand=input_files[0],
+        output=os.path.join(out_dir, "remapped.bin"),
+    )
+
+
+def _ftl_xsr2(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+    
+    call_tools.remap_xsr2(
+        in_nand=input_files[0],
+        in_oob=input_oobs[0],
+        output=out_dir,
+    )
+
+
+def _ftl_work_in_progress(input_files, input_oobs, out_dir, ftl_parameter):
+    raise NotImplementedError("This tool is still a work in progress.")
+
+
+def _ftl_fsr_f(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+    if ftl_parameter is None: raise ValueError("partition parameter is missing.")
+    
+    print("This process will take about 5 minutes...")
+    call_tools.remap_fsr_f(
+        partition=ftl_parameter,
+        in_nand=input_files[0],
+        in_oob=input_oobs[0],
+        output=os.path.join(out_dir, "remapped.bin"),
+        # Next to the FTL folder, not in it, so the log is not taken for an FTL output.
+        log_path=os.path.join(os.path.dirname(out_dir), "fsr_f.log"),
+    )
+
+
+def _ftl_fsr_ll(input_files, input_oobs, out_dir, ftl_parameter):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+    
+    print("This process will take about 10 minutes...")
+    call_tools.remap_fsr_ll(
+        in_nand=input_files[0],
+        in_oob=input_oobs[0],
+        output=os.path.join(out_dir, "remapped.bin"),
+        # Next to the FTL folder, not in it, so the log is not taken for an FTL output.
+        log_path=os.path.join(os.path.dirname(out_dir), "fsr_ll.log"),
+    )
+
+
+def _ftl_nothing(input_files, input_oobs, out_dir, ftl_parameter):
+    pass
+
+
+def _ftl_f0(input_files, input_oobs, out_dir, ftl_parameter):
+    call_tools.remap_f0(
+        in_nand=input_files[0],
+        output=out_dir,
+        ftl_parameter=ftl_parameter,
+    )
+
+
+def _ftl_sh900i(input_files, input_oobs, out_dir, ftl_parameter):
+    call_tools.remap_sh900i(
+        in_nand=input_files[0],
+        output=out_dir,
+        ftl_parameter=ftl_parameter,
+    )
+
+
+_FTL_HANDLERS = {
+    "SH/D904i FTL": _ftl_sh_d904i,
+    "B4B4 FTL": _ftl_b4b4,
+    "Fugue NAND": _ftl_fugue,
+    "Fugue NAND (A+B)": _ftl_fugue_ab,
+    "SSR200": _ftl_ssr200,
+    "SSR200 (old flavor)": _ftl_old_ssr200,
+    "XSR1": _ftl_xsr1,
+    "XSR2": _ftl_xsr2,
+    "XSR3": _ftl_work_in_progress,
+    "FSR_F": _ftl_fsr_f,
+    "FSR_ll": _ftl_fsr_ll,
+    "F900i FTL": _ftl_work_in_progress,
+    "FlashFX 3.00 NOR": _ftl_nothing,
+    "00F0F0 Structure": _ftl_f0,
+    "SH900i FTL": _ftl_sh900i,
+}
+
+
+def _fs_fat(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    call_tools.extract_fat(
+        input=input_files[0],
+        output=out_dir
+    )
+
+
+def _fs_customized_fat16(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    temp_dir = os.path.join(out_dir, "temp")
+    os.makedirs(temp_dir, exist_ok=True)
+    call_tools.carve_fat(
+        input=input_files[0],
+        output=temp_dir
+    )
+
+    with os.scandir(temp_dir) as it:
+        carved = sorted([e.path for e in it if e.is_file()])
+    standard_fats = [os.path.join(out_dir, f"{i:02}_converted_fat.img") for i in range(len(carved))]
+    extdirs = [os.path.join(out_dir, os.path.splitext(os.path.basename(f))[0] + "_extracted") for f in standard_fats]
+    # Each image gets its own temp folder so that the extractions do not see each other's output.
+    ext_temp_dirs = [os.path.join(temp_dir, f"extract_{i:02}") for i in range(len(carved))]
+    ensure_dirs(extdirs + ext_temp_dirs)
+
+    # The carved images are independent of each other, so they are processed in parallel; each image is
+    # extracted right after its conversion, while the converted image is still in the page cache.
+    with ThreadPoolExecutor(max_workers=inner_workers(min(len(carved), os.cpu_count() or 1))) as executor:
+        for _ in executor.map(_convert_and_extract_customized_fat16, carved, standard_fats, extdirs, ext_temp_dirs):
             pass
-        #case "Intel FHS (CG2)":
-            #pass
-        case "SH902i FS":
-            if len(input_files) < 2: raise FileNotFoundError("The second NOR file is required as the second argument.")
-
-            call_tools.extract_sh902i(
-                in_nors=input_files,
-                output=out_dir,
-            )
-        #case "DATA Structure":
-            #pass
-        #case "Sony Ericsson Custom FS":
-            #pass
-        #case "ext3":
-            #pass
-        case "N/A":
-            print("no FTL")
-        case _:
-            raise NotImplementedError(f"Unsupport filesystem: {fs_type}")
-        
+
+    shutil.rmtree(temp_dir)
+
+
+def _fs_jffs2(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    print("Processing may take several minutes...")
+    os.makedirs(out_dir, exist_ok=True)
+    carved_jffs2_dir = os.path.join(out_dir, "00_JFFS2_extracted")
+    call_tools.extract_jffs2(
+        input=input_files[0],
+        output=carved_jffs2_dir,
+    )
+
+
+def _fs_yaffs2(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    if input_oobs[0] is None: raise FileNotFoundError("OOB file is missing.")
+    if storage_type is None: raise ValueError("Storage_Type is required.")
+
+    storage_types = [t.strip() for t in storage_type.split(",")]
+    if len(input_files) < len(storage_types): raise FileNotFoundError(f"Not enough input files ({len(storage_types)} required)")
+
+    # Each storage has its own input, OOB and output folder, so they are extracted side by side.
+    with ThreadPoolExecutor(max_workers=inner_workers(len(storage_types))) as executor:
+        futures = []
+        for i, t in enumerate(storage_types):
+            y_model_name = model_name.lower().replace("-", "")
+
+            if t.lower() == "onenand":
+                config_name = f"config_{y_model_name}.json"
+            else:
+                config_name = f"config_{y_model_name}_{t.lower()}.json"
+
+            y_outdir = os.path.join(os.path.dirname(out_dir), f"{i:02}_{os.path.splitext(os.path.basename(input_files[i]))[0]}")
+
+            futures.append(executor.submit(
+                call_tools.extract_yaffs2,
+                in_nand=input_files[i],
+                in_oob=input_oobs[i],
+                output=y_outdir,
+                config_name=config_name,
+            ))
+        for future in as_completed(futures):
+            future.result()
+
+
+def _fs_ext3(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    if fs_parameter is None: raise ValueError("The FS Parameter is not defined")
+
+    offsets = [int(par.strip(), 16) for par in fs_parameter.split(",")]
+    jobs = [(os.path.join(out_dir, f"{i:02}_EXT3_0x{offset:09X}_extracted"), offset) for i, offset in enumerate(offsets)]
+
+    def extract(job):
+        ext_outdir, offset = job
+        call_tools.extract_ext3(
+            input=input_files[0],
+            output=ext_outdir,
+            offset=offset,
+        )
+
+    if len(jobs) == 1:
+        extract(jobs[0])
+        return
+
+    # All offsets read the same dump, so the siblings mostly hit the page cache.
+    with ThreadPoolExecutor(max_workers=inner_workers(len(jobs))) as executor:
+        for future in [executor.submit(extract, job) for job in jobs]:
+            future.result()
+
+
+def _fs_nothing(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    pass
+
+
+def _fs_sh902i(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    if len(input_files) < 2: raise FileNotFoundError("The second NOR file is required as the second argument.")
+
+    call_tools.extract_sh902i(
+        in_nors=input_files,
+        output=out_dir,
+    )
+
+
+def _fs_na(input_files, input_oobs, fs_parameter, out_dir, model_name, storage_type):
+    print("no FTL")
+
+
+_FS_HANDLERS = {
+    "FAT": _fs_fat,
+    "FAT12": _fs_fat,
+    "FAT16": _fs_fat,
+    "FAT32": _fs_fat,
+    "Samsung RFS": _fs_fat,
+    "KFAT": _fs_fat,
+    "Customized FAT16": _fs_customized_fat16,
+    "JFFS2": _fs_jffs2,
+    "YAFFS2": _fs_yaffs2,
+    "ext3": _fs_ext3,
+    "Qualcomm EFS2": _fs_nothing,
+    #"Intel FHS (CG2)": None,
+    "SH902i FS": _fs_sh902i,
+    #"DATA Structure": None,
+    #"Sony Ericsson Custom FS": None,
+    "N/A": _fs_na,
+}
+
+
+def _convert_and_extract_customized_fat16(carved_file, out_conv, extdir, temp_dir):
+    call_tools.convert_customized_fat16(
+        input=carved_file,
+        output=out_conv,
+    )
+    os.remove(carved_file)
+    _extract_fat_flat(out_conv, extdir, temp_dir)
+
+
+def _extract_fat_flat(fat_image, extdir, temp_dir):
+    # Extract it to a temp folder and then move it to delete the top folder.
+    call_tools.extract_fat(fat_image, temp_dir)
+    # On the same filesystem a plain rename is enough; shutil.move is only needed for a copy across devices.
+    same_device = os.stat(extdir).st_dev == os.stat(temp_dir).st_dev
+    with os.scandir(temp_dir) as tops:
+        for e in tops:
+            with os.scandir(e.path) as it:
+                for e2 in it:
+                    if same_device:
+                        os.replace(e2.path, os.path.join(extdir, e2.name))
+                    else:
+                        shutil.move(e2.path, extdir)
+            os.rmdir(e.path)
+
 
 def extract_media(media_type, out_ftl_dir, out_fs_dir, fs_roots, out_media_dir, profile):
     match media_type:
@@ -484,59 +876,68 @@ def extract_media(media_type, out_ftl_dir, out_fs_dir, fs_roots, out_media_dir,
                 scan_only_magics=True,
             )
         case "fs_sh900i":
-            for fs_root in fs_roots:
-                call_tools.run_scan_and_extract_sh900i_media(
-                    input=fs_root,
-                    output=out_media_dir,
-                )
+            # Each root is scanned into its own folder (so parallel scans cannot overwrite each other's files)
+            # and the results are merged into out_media_dir in the original order.
+            worker_dirs = [os.path.join(out_media_dir, f".sh900i_{i:02}") for i in range(len(fs_roots))]
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(fs_roots)))) as executor:
+                for _ in executor.map(
+                    lambda fs_root, worker_dir: call_tools.run_scan_and_extract_sh900i_media(input=fs_root, output=worker_dir),
+                    fs_roots, worker_dirs,
+                ):
+                    pass
+            for i, worker_dir in enumerate(worker_dirs):
+                if os.path.isdir(worker_dir):
+                    merge_tree(worker_dir, out_media_dir, suffix=f"_{i:02}")
+                    shutil.rmtree(worker_dir)
         case _:
             raise NotImplementedError(f"Unsupport media_type: {media_type}")
 
 
-def detect_model_info(input_file, model_infos):
-    path = os.path.abspath(input_file)
-
-    while True:
-        base = os.path.basename(path).lower()
-
-        best = None
-        best_len = 0
-        for model_info in model_infos:
-            name = to_ktdumper_modelname(model_info["Phone_Model"].strip())
-            if not name:
-                continue
-            if name in base and len(name) > best_len:
-                best = model_info
-                best_len = len(name)
-
-        if best is not None:
-            return best
-
-        parent = os.path.dirname(path)
-        if os.path.ismount(path) or parent == path or not parent:
-            break
-        path = parent
+def detect_model_info(input_file, model_by_norm):
+    """model_by_norm: as returned by index_model_infos."""
+    # Every ancestor name from the file upwards, split once instead of walking with dirname/ismount.
+    # (index_model_infos makes sure every model name contains a digit, so generic folders like "home" or "media"
+    # above a mount point never match.)
+    parts = [part.lower() for part in os.path.abspath(input_file).split(os.sep) if part]
+    # Instead of an `in` test per model, every substring of a folder name that has the length of some model name
+    # is looked up in the index: a few dozen dict lookups per folder instead of hundreds of scans.
+    # Longest names first; among names of equal length the first CSV row wins (the index keeps CSV order).
+    rank = {name: i for i, name in enumerate(model_by_norm)}
+    lengths = sorted({len(name) for name in model_by_norm if name}, reverse=True)
+
+    for base in reversed(parts):
+        for length in lengths:
+            hits = [base[i:i + length] for i in range(len(base) - length + 1) if base[i:i + length] in model_by_norm]
+            if hits:
+                return model_by_norm[min(hits, key=rank.__getitem__)]
 
     return None
 
 
 def get_oob_paths(input_files):
+    # One listing per input folder instead of an isfile per candidate.
+    # normcase keeps the lookup case-insensitive on Windows, like isfile is there.
+    files_by_dir = {}
+    for input_file in input_files:
+        input_dir = os.path.dirname(input_file)
+        if input_dir not in files_by_dir:
+            with os.scandir(input_dir or ".") as it:
+                files_by_dir[input_dir] = {os.path.normcase(e.name) for e in it if e.is_file()}
+
     oob_paths = []
 
     for input_file in input_files:
         input_dir = os.path.dirname(input_file)
         input_name = os.path.basename(input_file)
 
-        candidates = [os.path.join(input_dir, f"{os.path.splitext(input_name)[0]}.oob")]
+        candidates = [f"{os.path.splitext(input_name)[0]}.oob"]
         if input_name.lower().endswith("_data.bin"):
-            candidates.append(os.path.join(input_dir, f"{'_'.join(input_name.split('_')[:-1])}_oob.bin"))
-        
-        for candidate in candidates:
-            if os.path.isfile(candidate):
-                oob_paths.append(candidate)
-                break
-        else:
-            oob_paths.append(None)
+            candidates.append(f"{'_'.join(input_name.split('_')[:-1])}_oob.bin")
+
+        oob_paths.append(next(
+            (os.path.join(input_dir, c) for c in candidates if os.path.normcase(c) in files_by_dir[input_dir]),
+            None,
+        ))
     
     return oob_paths
 
@@ -548,13 +949,21 @@ if __name__ == "__main__":
     parser.add_argument("-s", "--skip-confirm", action="store_true")
     parser.add_argument("-m", "--forced-model", default=None, help="If not specified, auto-detect.")
     parser.add_argument("-z", "--fullsize-7z", action="store_true", help="Outputs the 7z file in full size instead of splitting it into 10MB parts.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of FTL output files processed at the same time (default: from the CPU count and the file system).")
+    parser.add_argument("--pause-on-exit", action="store_true", help="Wait for Enter before exiting (used by Extract.py).")
     args = parser.parse_args()
 
+    if args.pause_on_exit:
+        # atexit runs after an uncaught exception's traceback has been printed.
+        atexit.register(pause, "Finished. Press Enter to exit...")
+
     base_dir = os.path.dirname(os.path.abspath(__file__))
 
-    with open(os.path.join(base_dir, "models.csv"), encoding="utf8") as inf:
-        model_infos = tuple(csv.DictReader(inf))
+    model_infos = load_model_infos(os.path.join(base_dir, "models.csv"))
+    model_by_norm = index_model_infos(model_infos)
 
     input_files = [os.path.abspath(f) for f in args.input_file]
 
-    main(input_files, model_infos, args.skip_confirm, args.forced_model, args.fullsize_7z)
\ No newline at end of file
+    failed = main(input_files, model_infos, args.skip_confirm, args.forced_model, args.fullsize_7z, model_by_norm, args.jobs)
+    # 2, not 1: the run finished and collected what it could, but some FTL outputs were skipped.
+    sys.exit(2 if failed else 0)
\ No newline at end of file
@@ -1,11 +1,53 @@
+import asyncio
+import codecs
+import contextlib
+import locale
 import os
 import subprocess
 import shutil
+import sys
+import tempfile
+import threading
 from functools import lru_cache
 
+from . import py_runner
+
 BASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tools")
 VENV_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "virtual_env")
 
+# Scripts of the downloaded tools, joined once at import.
+_SEPARATE_NAND_OOB = os.path.join(BASE_PATH, "k", "separate_nand_oob.py")
+_KTTOOLS = os.path.join(BASE_PATH, "keitai-tools", "kttools.py")
+_SCAN_AND_EXTRACT_BY_EXTENSION = os.path.join(BASE_PATH, "k", "scan_and_extract_by_extension.py")
+_SCAN_AND_EXTRACT_SH900I_MEDIA = os.path.join(BASE_PATH, "k", "scan_and_extract_sh900i_media.py")
+_EXTRACT_MLD = os.path.join(BASE_PATH, "mld-tools", "extract_mld.py")
+_ASSEMBLE_XSR2 = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_xsr2.py")
+_FSR_F_EMU = os.path.join(BASE_PATH, "fs-tools", "fsr_f", "emu.py")
+_FSR_LL_EMU = os.path.join(BASE_PATH, "fs-tools", "fsr_ll", "emu.py")
+_B4_FTL_EXTRACT = os.path.join(BASE_PATH, "b4-ftl-extract", "extract.py")
+_ASSEMBLE_SH704I_D904I = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_sh704i_d904i.py")
+_FUGUE_TOOLS_EXTRACT = os.path.join(BASE_PATH, "fugue-tools", "extract.py")
+_CONVERT_SSR200 = os.path.join(BASE_PATH, "fs-tools", "ssr200", "convert_ssr200.py")
+_CONVERT_OLD_SSR200 = os.path.join(BASE_PATH, "fs-tools", "ssr200_old_flavor", "convert_old_ssr200.py")
+_ASSEMBLE_F0 = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_f0.py")
+_ASSEMBLE_SH900I = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_sh900i.py")
+_EXTRACT_FAT = os.path.join(BASE_PATH, "TSK-FAT-AutoRecover", "extract_fat.py")
+_YAFFS_TOOLS_EXTRACT = os.path.join(BASE_PATH, "yaffs-tools", "extract.py")
+_ASSEMBLE_SH902I = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_sh902i.py")
+_CONVERT_FAT = os.path.join(BASE_PATH, "fs-tools", "ssr200", "convert_fat.py")
+_JEFFERSON_DIR = os.path.join(BASE_PATH, "jefferson")
+_YAFFS_CONFIG_DIR = os.path.join(BASE_PATH, "yaffs-tools", "config")
+
+# Executables (Windows builds, and the rfs_dumper that download_tools.py builds on Linux)
+_7Z_EXE_WIN = os.path.join(BASE_PATH, "7-Zip", "7z.exe")
+_RFS_DUMPER_WIN = os.path.join(BASE_PATH, "rfs_dumper", "rfs_dumper_xsr1app.exe")
+_RFS_DUMPER_LINUX = os.path.join(BASE_PATH, "keitai_fs_tools", "xsr1", "xsr1app", "rfs_dumper_xsr1app")
+_TSK_RECOVER_EXE = os.path.join(BASE_PATH, "sleuthkit", "bin", "tsk_recover.exe")
+
+# KEITAIFSEXTRACTOR_PERSISTENT_WORKERS=0 runs every tool in a new process, as before the workers were added
+# (read at import, so the ProcessPoolExecutor workers in main.py see the same setting).
+_PERSISTENT_WORKERS = os.environ.get("KEITAIFSEXTRACTOR_PERSISTENT_WORKERS", "1") != "0"
+
 
 def get_python_from_venv(venv_path):
     if os.name == "nt":
@@ -26,31 +68,115 @@ def _get_cached_venv_python(venv_path):
     return None
 
 
-def run(commands, stdout=None, stderr=None, cwd=None, print_command=True):
-    if print_command: print(" ".join(commands))
-    subprocess.run(
-        commands,
-        stdout=stdout,
-        stderr=stderr,
-        check=True,
+# The tool paths do not change during a run, so each is probed once.
+# Only hits are kept, so a missing tool does not evict the others and is looked for again on the next call.
+_found_tool_files = set()
+_found_packages = {}
+
+
+def _tool_isfile(path):
+    if path in _found_tool_files:
+        return True
+    if os.path.isfile(path):
+        _found_tool_files.add(path)
+        return True
+    return False
+
+
+def _tool_which(pkg):
+    found = _found_packages.get(pkg)
+    if found is None:
+        found = shutil.which(pkg)
+        if found is not None:
+            _found_packages[pkg] = found
+    return found
+
+
+async def _pump(stream, console, log_path=None):
+    # The pipe is drained as the tool writes, so its buffer never fills up and stalls the tool.
+    binary = getattr(console, "buffer", None)
+    # A console without a byte layer (an IDE, a StringIO) gets the output decoded as the tool wrote it.
+    decoder = None if binary is not None else codecs.getincrementaldecoder(locale.getpreferredencoding(False))("replace")
+    with open(log_path, "wb") if log_path else contextlib.nullcontext() as log:
+        while chunk := await stream.read(0x10000):
+            if log is not None:
+                log.write(chunk)
+            if console is None:
+                continue
+            if binary is not None:
+                # whatever was printed through the text layer goes out first
+                console.flush()
+                binary.write(chunk)
+                binary.flush()
+            else:
+                console.write(decoder.decode(chunk))
+        if decoder is not None and console is not None:
+            console.write(decoder.decode(b"", final=True))
+
+
+async def run_async(commands, stdout=None, stderr=None, cwd=None, print_command=True, log_path=None):
+    """log_path: also write the tool's stdout to this file (it is still shown on the console).
+
+    A PIPE given for stdout or stderr is drained while the tool runs and forwarded to the console,
+    so a tool with a lot of output can never block on a full pipe.
+    """
+    # flushed, so the command line is not left in the buffer behind the tool's own output
+    if print_command: print(" ".join(commands), flush=True)
+    pipe_stdout = log_path is not None or stdout == subprocess.PIPE
+    pipe_stderr = stderr == subprocess.PIPE
+    proc = await asyncio.create_subprocess_exec(
+        *commands,
+        stdout=asyncio.subprocess.PIPE if pipe_stdout else stdout,
+        stderr=asyncio.subprocess.PIPE if pipe_stderr else stderr,
         cwd=cwd
     )
-
-
-def run_python(py_path, commands, stdout=None, stderr=None, cwd=None, print_command=True):
-    venv_python = _get_cached_venv_python(VENV_PATH)
+    waits = [proc.wait()]
+    if pipe_stdout:
+        waits.append(_pump(proc.stdout, sys.stdout, log_path))
+    if pipe_stderr:
+        waits.append(_pump(proc.stderr, sys.stderr))
+    try:
+        returncode = (await asyncio.gather(*waits))[0]
+    except asyncio.CancelledError:
+        # Do not leave the tool running when the caller gives up on it.
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, commands)
+
+
+def run(commands, stdout=None, stderr=None, cwd=None, print_command=True, log_path=None):
+    asyncio.run(run_async(commands, stdout, stderr, cwd, print_command, log_path))
+
+
+def run_python(py_path, commands, stdout=None, stderr=None, cwd=None, print_command=True, log_path=None, persistent=False):
+    """persistent: run it in a long-lived worker (utils/py_runner.py) that keeps the library imports between calls.
+    The worker starts each call with a fresh __main__ and re-imports the tool's own modules, but a tool that
+    keeps state elsewhere (e.g. in a C extension) must not use it. The worker inherits stdout or discards it,
+    so stderr and log_path cannot be combined with it."""
+    # normcase: one cache entry however the path is spelled (Windows paths are case-insensitive)
+    venv_python = _get_cached_venv_python(os.path.normcase(VENV_PATH))
     if venv_python is None:
+        _get_cached_venv_python.cache_clear()
         raise FileNotFoundError("Virtualenv python not found. Create virtual_env")
 
     _commands = [venv_python] + commands
-    if os.path.isfile(py_path):
-        run(_commands, stdout, stderr, cwd, print_command)
-    else:
+    if not _tool_isfile(py_path):
         raise FileNotFoundError(f"Not Found {py_path}")
+
+    if persistent and _PERSISTENT_WORKERS:
+        if stderr is not None or log_path is not None or commands[0] != py_path:
+            raise ValueError("A persistent worker runs py_path itself and cannot redirect stderr or write a log.")
+        if print_command: print(" ".join(_commands), flush=True)
+        py_runner.run(venv_python, py_path, commands[1:], stdout, cwd)
+    else:
+        run(_commands, stdout, stderr, cwd, print_command, log_path)
     
 
 def run_exe(exe_path, commands, stdout=None, stderr=None, cwd=None, print_command=True):
-    if not os.path.isfile(exe_path):
+    if not _tool_isfile(exe_path):
         raise FileNotFoundError(f"{exe_path} does not exist.")
 
     _commands = [exe_path] + commands
@@ -65,7 +191,7 @@ def run_linux_package(pkg, commands, stdout=None, stderr=None, cwd=None, print_c
     if os.name == "nt":
         raise Exception("os not linux")
     
-    if not shutil.which(pkg):
+    if not _tool_which(pkg):
         print(f"{pkg} is not installed.")
 
     _commands = [pkg] + commands
@@ -74,7 +200,7 @@ def run_linux_package(pkg, commands, stdout=None, stderr=None, cwd=None, print_c
 
 
 def separate_nand_oob(input, layout, out_nand, out_oob):
-    py_path = os.path.join(BASE_PATH, "k", "separate_nand_oob.py")
+    py_path = _SEPARATE_NAND_OOB
     commands = [
         py_path,
         input,
@@ -86,7 +212,7 @@ def separate_nand_oob(input, layout, out_nand, out_oob):
 
 
 def run_keitai_tools(input):
-    py_path = os.path.join(BASE_PATH, "keitai-tools", "kttools.py")
+    py_path = _KTTOOLS
     commands = [
         py_path,
         input,
@@ -94,25 +220,26 @@ def run_keitai_tools(input):
     run_python(py_path, commands)
 
 
-def run_7zip(input, output, fullsize_7z):
+def run_7zip(input, output, fullsize_7z, level=9, threads=None):
     commands = [
         "a",
         "-t7z",  # 7z
-        "-mx=9", # compression level
+        f"-mx={level}", # compression level
+        f"-mmt={threads or 'on'}", # LZMA2 threads
     ]
     if not fullsize_7z:
         commands.append("-v10m") # Split Compression (MB)
 
     commands += [output, input]
     if os.name == "nt":
-        exe_path = os.path.join(BASE_PATH, "7-Zip", "7z.exe")
+        exe_path = _7Z_EXE_WIN
         run_exe(exe_path, commands, stdout=subprocess.DEVNULL)
     else:
         run_linux_package("7z", commands, stdout=subprocess.DEVNULL)
 
 
 def run_scan_and_extract_by_extension(input, output, profile, scan_only_magics=None, search_window=0x1000):
-    py_path = os.path.join(BASE_PATH, "k", "scan_and_extract_by_extension.py")
+    py_path = _SCAN_AND_EXTRACT_BY_EXTENSION
     commands = [
         py_path,
         "--extract",
@@ -127,7 +254,7 @@ def run_scan_and_extract_by_extension(input, output, profile, scan_only_magics=N
 
 
 def run_scan_and_extract_sh900i_media(input, output):
-    py_path = os.path.join(BASE_PATH, "k", "scan_and_extract_sh900i_media.py")
+    py_path = _SCAN_AND_EXTRACT_SH900I_MEDIA
     commands = [
         py_path,
         input,
@@ -137,7 +264,7 @@ def run_scan_and_extract_sh900i_media(input, output):
 
 
 def run_extract_mld(input, output):
-    py_path = os.path.join(BASE_PATH, "mld-tools", "extract_mld.py")
+    py_path = _EXTRACT_MLD
     commands = [
         py_path,
         input,
@@ -153,15 +280,15 @@ def remap_xsr1(in_nand, output):
     ]
 
     if os.name == "nt":
-        exe_path = os.path.join(BASE_PATH, "rfs_dumper", "rfs_dumper_xsr1app.exe")
+        exe_path = _RFS_DUMPER_WIN
     else:
-        exe_path = os.path.join(BASE_PATH, "keitai_fs_tools", "xsr1", "xsr1app", "rfs_dumper_xsr1app")
+        exe_path = _RFS_DUMPER_LINUX
 
     run_exe(exe_path, commands)
 
 
 def remap_xsr2(in_nand, in_oob, output):
-    py_path = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_xsr2.py")
+    py_path = _ASSEMBLE_XSR2
     commands = [
         py_path,
         in_nand,
@@ -171,8 +298,8 @@ def remap_xsr2(in_nand, in_oob, output):
     run_python(py_path, commands)
 
 
-def remap_fsr_f(in_nand, in_oob, partition, output):
-    py_path = os.path.join(BASE_PATH, "fs-tools", "fsr_f", "emu.py")
+def remap_fsr_f(in_nand, in_oob, partition, output, log_path=None):
+    py_path = _FSR_F_EMU
     commands = [
         py_path,
         partition,
@@ -180,22 +307,22 @@ def remap_fsr_f(in_nand, in_oob, partition, output):
         in_oob,
         output,
     ]
-    run_python(py_path, commands)
+    run_python(py_path, commands, log_path=log_path)
 
 
-def remap_fsr_ll(in_nand, in_oob, output):
-    py_path = os.path.join(BASE_PATH, "fs-tools", "fsr_ll", "emu.py")
+def remap_fsr_ll(in_nand, in_oob, output, log_path=None):
+    py_path = _FSR_LL_EMU
     commands = [
         py_path,
         in_nand,
         in_oob,
         output,
     ]
-    run_python(py_path, commands)
+    run_python(py_path, commands, log_path=log_path)
 
 
 def remap_b4b4(in_nand, in_oob, output):
-    py_path = os.path.join(BASE_PATH, "b4-ftl-extract", "extract.py")
+    py_path = _B4_FTL_EXTRACT
     commands = [
         py_path,
         in_nand,
@@ -207,7 +334,7 @@ def remap_b4b4(in_nand, in_oob, output):
 
 
 def remap_sh_d904i(in_nand, in_oob, output):
-    py_path = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_sh704i_d904i.py")
+    py_path = _ASSEMBLE_SH704I_D904I
     commands = [
         py_path,
         in_nand,
@@ -218,7 +345,7 @@ def remap_sh_d904i(in_nand, in_oob, output):
 
 
 def remap_fugue(in_nands, in_oobs, output, ftl_parameter=None):
-    py_path = os.path.join(BASE_PATH, "fugue-tools", "extract.py")
+    py_path = _FUGUE_TOOLS_EXTRACT
     common_command = [
         py_path,
     ]
@@ -240,7 +367,7 @@ def remap_fugue(in_nands, in_oobs, output, ftl_parameter=None):
 
 
 def remap_ssr200(in_nand, in_oob, output):
-    py_path = os.path.join(BASE_PATH, "fs-tools", "ssr200", "convert_ssr200.py")
+    py_path = _CONVERT_SSR200
     commands = [
         py_path,
         in_nand,
@@ -251,7 +378,7 @@ def remap_ssr200(in_nand, in_oob, output):
 
 
 def remap_old_ssr200(in_nand, in_oob, output):
-    py_path = os.path.join(BASE_PATH, "fs-tools", "ssr200_old_flavor", "convert_old_ssr200.py")
+    py_path = _CONVERT_OLD_SSR200
     commands = [
         py_path,
         in_nand,
@@ -262,7 +389,7 @@ def remap_old_ssr200(in_nand, in_oob, output):
     
 
 def remap_f0(in_nand, output, ftl_parameter):
-    py_path = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_f0.py")
+    py_path = _ASSEMBLE_F0
     commands = [
         py_path,
         in_nand,
@@ -275,7 +402,7 @@ def remap_f0(in_nand, output, ftl_parameter):
 
 
 def remap_sh900i(in_nand, output, ftl_parameter=None):
-    py_path = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_sh900i.py")
+    py_path = _ASSEMBLE_SH900I
     commands = [
         py_path,
         in_nand,
@@ -287,13 +414,13 @@ def remap_sh900i(in_nand, output, ftl_parameter=None):
 
 
 def extract_fat(input, output):
-    py_path = os.path.join(BASE_PATH, "TSK-FAT-AutoRecover", "extract_fat.py")
+    py_path = _EXTRACT_FAT
     commands = [
         py_path,
         input,
         "--output", output,
     ]
-    run_python(py_path, commands)
+    run_python(py_path, commands, persistent=True)
 
 
 def extract_ext3(input, output, offset):
@@ -306,14 +433,14 @@ def extract_ext3(input, output, offset):
     ]
 
     if os.name == "nt":
-        exe_path = os.path.join(BASE_PATH, "sleuthkit", "bin", "tsk_recover.exe")
+        exe_path = _TSK_RECOVER_EXE
         run_exe(exe_path, commands)
     else:
         run_linux_package("tsk_recover", commands)
 
 
 def extract_jffs2(input, output):
-    cwd = os.path.join(BASE_PATH, "jefferson")
+    cwd = _JEFFERSON_DIR
     commands = [
         "-m", "jefferson.cli",
         "--dest", output,
@@ -323,11 +450,30 @@ def extract_jffs2(input, output):
     run_module(commands, cwd=cwd)
 
 
+def _remove_tree_in_background(path):
+    """
+    Rename path aside and delete it in a background thread, so path can be written again right away.
+    Returns the thread (None if there was nothing to delete); join it before anything lists path's folder.
+    """
+    if not os.path.lexists(path):
+        return None
+    # the aside folder is created next to path, so the rename stays on the same filesystem
+    aside_root = tempfile.mkdtemp(prefix=os.path.basename(path) + ".failed_", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        os.rename(path, os.path.join(aside_root, "tree"))
+    except OSError:
+        # e.g. a file inside is still open on Windows
+        shutil.rmtree(path, ignore_errors=True)
+    remover = threading.Thread(target=shutil.rmtree, args=(aside_root,), kwargs={"ignore_errors": True})
+    remover.start()
+    return remover
+
+
 def extract_yaffs2(in_nand, in_oob, output, config_name):
-    py_path = os.path.join(BASE_PATH, "yaffs-tools", "extract.py")
-    config_path = os.path.join(BASE_PATH, "yaffs-tools", "config", config_name)
+    py_path = _YAFFS_TOOLS_EXTRACT
+    config_path = os.path.join(_YAFFS_CONFIG_DIR, config_name)
 
-    if not os.path.isfile(config_path): 
+    if not _tool_isfile(config_path): 
         raise FileNotFoundError(f"The YAFFS2 tool configuration file does not exist: {config_path}")
 
     commands = [
@@ -344,7 +490,7 @@ def extract_yaffs2(in_nand, in_oob, output, config_name):
         run_python(py_path, commands)
     except subprocess.CalledProcessError:
         print("Processing failed. Retrying with the recovery option disabled.")
-        shutil.rmtree(output, ignore_errors=True)
+        remover = _remove_tree_in_background(output)
         commands2 = [
             py_path,
             in_nand,
@@ -353,11 +499,16 @@ def extract_yaffs2(in_nand, in_oob, output, config_name):
             "--input-oob", in_oob, 
             "--mix-spare", "--no-show-deleted", "--no-show-missing",
         ]
-        run_python(py_path, commands2)
+        try:
+            run_python(py_path, commands2)
+        finally:
+            # the aside folder is next to output, inside the tree main() scans for fs roots afterwards
+            if remover is not None:
+                remover.join()
     
 
 def extract_sh902i(in_nors, output):
-    py_path = os.path.join(BASE_PATH, "various-keitai-assemble", "assemble_sh902i.py")
+    py_path = _ASSEMBLE_SH902I
     commands = [
         py_path,
         "--ignore"
@@ -371,7 +522,7 @@ def extract_sh902i(in_nors, output):
 
 
 def carve_fat(input, output):
-    py_path = os.path.join(BASE_PATH, "TSK-FAT-AutoRecover", "extract_fat.py")
+    py_path = _EXTRACT_FAT
     commands = [
         py_path,
         input,
@@ -379,14 +530,14 @@ def carve_fat(input, output):
         "--no-extract-fat",
         "--output", output,
     ]
-    run_python(py_path, commands, stdout=subprocess.DEVNULL, print_command=False)
+    run_python(py_path, commands, stdout=subprocess.DEVNULL, print_command=False, persistent=True)
 
 
 def convert_customized_fat16(input, output):
-    py_path = os.path.join(BASE_PATH, "fs-tools", "ssr200", "convert_fat.py")
+    py_path = _CONVERT_FAT
     commands = [
         py_path,
         input,
         output,
     ]
-    run_python(py_path, commands)
+    run_python(py_path, commands, persistent=True)
@@ -4,24 +4,47 @@ GitHub downloader utilities.
 
 Contains:
 - download_latest_github_release(...) : download a release asset (keeps manifest per output folder)
+- download_release_assets(...) : same, for several assets of one release with a single API query
 - download_latest_repo_snapshot(...) : check latest commit for a ref and download zipball if commit changed
 
 Both functions share helpers for manifest handling, download/extract, and use GITHUB_TOKEN if present.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from datetime import datetime, timezone
+import copy
+import io
 import os
+import sys
 import requests
-import tempfile
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import shutil
+import tempfile
+import threading
 import zipfile
 import json
 import hashlib
 import re
 
+from .parallel import run_batch
+
 MANIFEST_FILENAME = "manifest.json"
+# Files at least this large are downloaded as parallel range requests when the server allows it.
+RANGE_DOWNLOAD_MIN_SIZE = 8 * 1024 * 1024
+RANGE_DOWNLOAD_PARTS = 4
+# Read straight from the socket in large blocks (the assets are already compressed, so they are not re-encoded).
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# A zipball that is extracted right away is kept in memory up to this size, and spills to disk beyond it.
+SNAPSHOT_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+ZIP_EXTRACT_WORKERS = 8
+
+# Folders this process has already created (or found); downloads run in several threads.
+_ensured_dirs = set()
+_ensured_dirs_lock = threading.Lock()
 
 
 # ----------------------
@@ -29,140 +52,336 @@ MANIFEST_FILENAME = "manifest.json"
 # ----------------------
 def _compute_sha256(path: Path) -> str:
     """Compute SHA256 hex digest for a file."""
-    h = hashlib.sha256()
     with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        if hasattr(hashlib, "file_digest"):
+            # Python 3.11+: read and hashed in C, with the GIL released
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
             h.update(chunk)
-    return h.hexdigest()
+        return h.hexdigest()
 
 
-def _load_manifest(output_folder: Path) -> Optional[Dict[str, Any]]:
-    """Load manifest.json from output_folder if present and valid, otherwise return None."""
-    mf = output_folder / MANIFEST_FILENAME
-    if not mf.exists():
-        return None
+@lru_cache(maxsize=64)
+def _read_manifest_cached(path: str, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+    # mtime_ns and size are only part of the key, so a manifest changed on disk is read again
     try:
-        with mf.open("r", encoding="utf-8") as fh:
+        with open(path, "r", encoding="utf-8") as fh:
             return json.load(fh)
     except Exception:
         # treat corrupt manifest as absent
         return None
 
 
+def _ensure_dir(path: Path):
+    """mkdir -p, once per folder for the life of the process (see _forget_dir)."""
+    key = os.path.abspath(path)
+    with _ensured_dirs_lock:
+        if key in _ensured_dirs:
+            return
+    path.mkdir(parents=True, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(key)
+
+
+def _forget_dir(path):
+    """Drop path and everything below it from the _ensure_dir cache, after it is removed."""
+    key = os.path.abspath(path)
+    with _ensured_dirs_lock:
+        for d in [d for d in _ensured_dirs if d == key or d.startswith(key + os.sep)]:
+            _ensured_dirs.discard(d)
+
+
+def _load_manifest(output_folder: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load manifest.json from output_folder if present and valid, otherwise return None.
+    The parsed manifest is cached per (path, mtime, size); callers get their own copy to modify.
+    """
+    mf = output_folder / MANIFEST_FILENAME
+    try:
+        st = mf.stat()
+    except OSError:
+        return None
+    manifest = _read_manifest_cached(os.fspath(mf), st.st_mtime_ns, st.st_size)
+    return copy.deepcopy(manifest)
+
+
 def _save_manifest(output_folder: Path, data: Dict[str, Any]):
     """Write manifest.json (pretty-printed) into output_folder (creates folder if needed)."""
-    output_folder.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(output_folder)
     mf = output_folder / MANIFEST_FILENAME
     with mf.open("w", encoding="utf-8") as fh:
         json.dump(data, fh, ensure_ascii=False, indent=2)
+    # a rewrite within the filesystem's timestamp resolution could keep the same key
+    _read_manifest_cached.cache_clear()
 
 
-def download_file(url: str, out_path: Path, session: requests.Session):
+def _download_range(url: str, path: Path, start: int, end: int, session: requests.Session):
+    """Download bytes start..end (inclusive) of url into the same region of a pre-allocated file."""
+    with session.get(url, stream=True, headers={"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"}) as r:
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise Exception(f"Server ignored the range request for {url}")
+        # os.pwrite is not available on Windows, so each part uses its own handle.
+        with path.open("r+b") as fh:
+            fh.seek(start)
+            while chunk := r.raw.read(DOWNLOAD_CHUNK_SIZE, decode_content=True):
+                fh.write(chunk)
+
+
+def download_file(url: str, out_path: Path, session: requests.Session, parts: int = RANGE_DOWNLOAD_PARTS) -> Tuple[Path, str]:
     """
     Download file to out_path (atomic via .part file). Raises on HTTP errors.
+    Returns (out_path, SHA256 hex digest).
+
+    If the server advertises `Accept-Ranges: bytes` for a large file, it is fetched as
+    `parts` parallel range requests; otherwise a single streamed GET is used.
+    A streamed GET is hashed while it downloads; range parts arrive out of order, so that file is hashed afterwards.
     """
     tmp = out_path.with_suffix(out_path.suffix + ".part")
-    with session.get(url, stream=True) as r:
-        r.raise_for_status()
-        tmp.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(tmp.parent)
+
+    head = session.head(url, allow_redirects=True)
+    size = int(head.headers.get("Content-Length") or 0)
+    if (parts > 1 and head.ok and size >= RANGE_DOWNLOAD_MIN_SIZE
+            and head.headers.get("Accept-Ranges", "").lower() == "bytes"):
         with tmp.open("wb") as fh:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
+            fh.truncate(size)
+        part_size = -(-size // parts)
+        # The original url is requested so that redirects are followed (and credentials dropped) as usual.
+        with ThreadPoolExecutor(max_workers=parts) as executor:
+            futures = [
+                executor.submit(_download_range, url, tmp, start, min(start + part_size, size) - 1, session)
+                for start in range(0, size, part_size)
+            ]
+            for future in futures:
+                future.result()
+        sha256 = _compute_sha256(tmp)
+    else:
+        h = hashlib.sha256()
+        with session.get(url, stream=True, headers={"Accept-Encoding": "identity"}) as r:
+            r.raise_for_status()
+            with tmp.open("wb") as fh:
+                while chunk := r.raw.read(DOWNLOAD_CHUNK_SIZE, decode_content=True):
                     fh.write(chunk)
+                    h.update(chunk)
+        sha256 = h.hexdigest()
     tmp.replace(out_path)  # atomic-ish rename
-    return out_path
+    return out_path, sha256
 
 
-def extract_zip(zip_path: Path, output_folder: Path, remove_zip: bool = True, flatten_single_top_level: bool = True):
+def _download_to_spool(url: str, session: requests.Session, spool_dir: Path):
+    """
+    Download url into a temporary file, hashing it on the way.
+    Returns (file object positioned at 0, SHA256 hex digest, size). The caller closes the file.
     """
-    Extract zip to output_folder using a temp dir; if zip contains a single top-level directory
-    and flatten_single_top_level is True, move that directory's contents into output_folder.
+    h = hashlib.sha256()
+    if sys.version_info >= (3, 11):
+        spool = tempfile.SpooledTemporaryFile(max_size=SNAPSHOT_SPOOL_MAX_SIZE, dir=spool_dir)
+    else:
+        # Before 3.11 SpooledTemporaryFile has no seekable(), which ZipFile needs.
+        spool = tempfile.TemporaryFile(dir=spool_dir)
+    try:
+        with session.get(url, stream=True, headers={"Accept-Encoding": "identity"}) as r:
+            r.raise_for_status()
+            while chunk := r.raw.read(DOWNLOAD_CHUNK_SIZE, decode_content=True):
+                spool.write(chunk)
+                h.update(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    size = spool.tell()
+    spool.seek(0)
+    return spool, h.hexdigest(), size
+
+
+def _zip_member_parts(name: str) -> List[str]:
+    """Path components of a ZIP member name, sanitized the way ZipFile.extractall does (no drive, root or "..")."""
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+    if parts and parts[0].endswith(":"):
+        parts = parts[1:]
+    return parts
+
+
+def _remove_entry(entry: os.DirEntry):
+    # DirEntry carries the type from the directory scan, so no extra stat is needed
+    if entry.is_dir(follow_symlinks=False):
+        shutil.rmtree(entry.path)
+        _forget_dir(entry.path)
+    else:
+        os.unlink(entry.path)
+
+
+def extract_zip(zip_path, output_folder: Path, remove_zip: bool = True, flatten_single_top_level: bool = True):
+    """
+    Extract zip to output_folder; if zip contains a single top-level directory
+    and flatten_single_top_level is True, that directory's contents go directly into output_folder.
+    zip_path may also be a seekable binary file object (remove_zip is then ignored).
 
     Existing files/dirs in output_folder with the same names are removed/replaced.
+    Members are streamed straight to their destination (no temp dir and second move); each file is
+    written as <name>.part and renamed when complete, so an interrupted run leaves no truncated files behind.
     """
     if not zipfile.is_zipfile(zip_path):
         raise Exception("File is not a valid ZIP archive")
 
-    temp_dir = Path(tempfile.mkdtemp(prefix="extract_zip_"))
-    try:
-        with zipfile.ZipFile(str(zip_path), "r") as z:
-            z.extractall(temp_dir)
+    is_path = isinstance(zip_path, (str, os.PathLike))
+    with zipfile.ZipFile(os.fspath(zip_path) if is_path else zip_path, "r") as z:
+        members = [(info, parts) for info in z.infolist() if (parts := _zip_member_parts(info.filename))]
 
-        entries = [e for e in os.listdir(temp_dir) if e not in ("__MACOSX",) and not e.startswith(".DS_Store")]
+        tops = {parts[0] for _, parts in members if parts[0] != "__MACOSX" and not parts[0].startswith(".DS_Store")}
+        top = None
+        if flatten_single_top_level and len(tops) == 1:
+            candidate = next(iter(tops))
+            # only a directory is flattened, never a single file
+            if any(len(parts) > 1 or info.is_dir() for info, parts in members if parts[0] == candidate):
+                top = candidate
 
-        if flatten_single_top_level and len(entries) == 1:
-            single = entries[0]
-            single_path = temp_dir / single
-            source_root = single_path if single_path.exists() else temp_dir
+        # ensure output folder exists
+        _ensure_dir(output_folder)
+        with os.scandir(output_folder) as it:
+            # normcase: on Windows "Foo" in the zip replaces an existing "foo"
+            existing = {os.path.normcase(e.name): e for e in it}
+
+        replaced = set()
+        # folders made during this extraction; all of them are below the replaced top-level items
+        made = set()
+        files = {}
+        for info, parts in members:
+            if top is not None:
+                if parts[0] != top or len(parts) == 1:
+                    continue
+                parts = parts[1:]
+
+            # Replace each existing top-level item once, before the first member is written into it
+            if parts[0] not in replaced:
+                replaced.add(parts[0])
+                entry = existing.get(os.path.normcase(parts[0]))
+                if entry is not None:
+                    _remove_entry(entry)
+
+            d = output_folder.joinpath(*parts)
+            if info.is_dir():
+                if d not in made:
+                    d.mkdir(parents=True, exist_ok=True)
+                    made.add(d)
+                continue
+            if d.parent not in made:
+                d.parent.mkdir(parents=True, exist_ok=True)
+                made.add(d.parent)
+            # a name listed twice keeps the last member, as with extracting in order
+            files.pop(d, None)
+            files[d] = info
+
+        def write_member(d, info):
+            part = d.with_name(d.name + ".part")
+            with z.open(info) as src, open(part, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(part, d)
+
+        # Inflating is done in zlib with the GIL released, and ZipFile serializes the reads of the
+        # underlying file itself, so members are written in parallel.
+        workers = min(ZIP_EXTRACT_WORKERS, os.cpu_count() or 1, len(files))
+        if workers <= 1:
+            for d, info in files.items():
+                write_member(d, info)
         else:
-            source_root = temp_dir
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(write_member, d, info) for d, info in files.items()]:
+                    future.result()
 
-        # ensure output folder exists
-        output_folder.mkdir(parents=True, exist_ok=True)
-
-        # Move each item, replacing existing
-        for name in os.listdir(source_root):
-            s = Path(source_root) / name
-            d = output_folder / name
-
-            if d.exists():
-                if d.is_dir() and not d.is_symlink():
-                    shutil.rmtree(d)
-                else:
-                    d.unlink()
-            shutil.move(str(s), str(d))
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
-
-    if remove_zip:
+    if remove_zip and is_path:
         try:
-            zip_path.unlink()
+            os.unlink(zip_path)
         except OSError:
             pass
 
     return output_folder
 
 
+@lru_cache(maxsize=1)
 def _get_github_session():
-    """Return a requests.Session configured with optional GITHUB_TOKEN and a User-Agent."""
+    """
+    Return the shared requests.Session configured with optional GITHUB_TOKEN and a User-Agent.
+
+    One session for all downloads, so keep-alive reuses the connections to api.github.com and the
+    download hosts; transient errors (429 and 5xx gateway errors) are retried with backoff.
+    """
     s = requests.Session()
     token = os.environ.get("GITHUB_TOKEN")
     if token:
         s.headers.update({"Authorization": f"token {token}"})
     s.headers.update({"User-Agent": "manifest-downloader/1.0"})
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504], raise_on_status=False)
+    # several tools and range parts are downloaded at the same time
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
     return s
 
 
-# ----------------------------------------
-# Existing function: release asset download
-# (left unchanged in behavior; shared helpers used)
-# ----------------------------------------
-def download_latest_github_release(
-    repo_owner: str,
-    repo_name: str,
-    asset_pattern: str,
-    output_folder: str,
-    enable_extract_zip: bool = False,
-    force: bool = False,
-) -> Path:
+def _api_get(url: str, session: requests.Session, etag: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
-    Download the latest GitHub release asset matching asset_pattern and save/extract it into output_folder.
+    GET a GitHub API url and return (json, etag).
 
-    Behavior:
-    - A manifest.json is stored in output_folder describing the downloaded release (tag, asset, sha256, etc).
-    - If manifest's release_tag matches the latest tag and force is False, the function will skip download.
-    - If enable_extract_zip is True and the asset is a .zip, it will be extracted into output_folder.
+    With the ETag of an earlier response, GitHub answers 304 Not Modified (no body, and it does not count
+    against the rate limit) when nothing changed; json is then None.
     """
-    output_folder = Path(output_folder)
-    manifest = _load_manifest(output_folder)
+    headers = {"If-None-Match": etag} if etag else {}
+    resp = session.get(url, headers=headers)
+    if etag and resp.status_code == 304:
+        return None, etag
+    resp.raise_for_status()
+    return resp.json(), resp.headers.get("ETag")
+
 
+def _query_latest_release(
+    repo_owner: str, repo_name: str, session: requests.Session, etag: Optional[str] = None, log: Callable[[str], None] = print,
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Return (JSON of the latest release of repo_owner/repo_name, ETag); the JSON is None if etag is still current."""
     api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/latest"
-    session = _get_github_session()
+    log(f"Querying GitHub releases for {repo_owner}/{repo_name}...")
+    return _api_get(api_url, session, etag)
 
-    print(f"Querying GitHub releases for {repo_owner}/{repo_name}...")
-    resp = session.get(api_url)
-    resp.raise_for_status()
-    release_data = resp.json()
+
+def _release_etag(manifest: Optional[Dict[str, Any]], asset_pattern: str, force: bool) -> Optional[str]:
+    """The ETag to send for a release query, if the manifest can stand in for an unchanged release."""
+    if force or not manifest or not manifest.get("release_tag"):
+        return None
+    if not re.search(asset_pattern, manifest.get("asset_name") or ""):
+        return None
+    return manifest.get("api_etag")
+
+
+def _existing_release_result(output_folder: Path, enable_extract_zip: bool, asset_name: str) -> Path:
+    if enable_extract_zip:
+        return output_folder
+    local_file = output_folder / asset_name
+    if local_file.exists():
+        return local_file
+    return output_folder
+
+
+def _install_release_asset(
+    repo: str,
+    release_data: Dict[str, Any],
+    asset_pattern: str,
+    output_folder: Path,
+    enable_extract_zip: bool,
+    force: bool,
+    session: requests.Session,
+    etag: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> Path:
+    """
+    Download (or skip, by manifest) the asset of release_data matching asset_pattern into output_folder.
+    release_data None means the API answered 304 to the manifest's ETag: the release is the one in the manifest.
+    """
+    manifest = _load_manifest(output_folder)
+
+    if release_data is None:
+        log(f"Skipping download: release unchanged ({manifest.get('release_tag')}).")
+        return _existing_release_result(output_folder, enable_extract_zip, manifest.get("asset_name") or "")
 
     tag_name = release_data.get("tag_name") or release_data.get("name") or ""
     release_id = release_data.get("id")
@@ -181,7 +400,7 @@ def download_latest_github_release(
     asset_id = matched_asset.get("id")
     asset_size = matched_asset.get("size")
 
-    print(f"Latest release tag: {tag_name}, asset: {asset_name}")
+    log(f"Latest release tag: {tag_name}, asset: {asset_name}")
 
     # decide whether to skip based on manifest (tag comparison)
     if not force and manifest:
@@ -189,14 +408,12 @@ def download_latest_github_release(
         old_asset_name = manifest.get("asset_name")
         if old_tag and old_tag == tag_name:
             # Tag hasn't changed -> skip
-            print(f"Skipping download: release tag unchanged ({tag_name}).")
-            if enable_extract_zip:
-                return output_folder
-            else:
-                local_file = output_folder / asset_name
-                if local_file.exists():
-                    return local_file
-                return output_folder
+            log(f"Skipping download: release tag unchanged ({tag_name}).")
+            if etag and manifest.get("api_etag") != etag:
+                # so that the next run can ask with If-None-Match
+                manifest["api_etag"] = etag
+                _save_manifest(output_folder, manifest)
+            return _existing_release_result(output_folder, enable_extract_zip, asset_name)
 
     # Proceed to download
     download_url = matched_asset.get("browser_download_url")
@@ -204,37 +421,34 @@ def download_latest_github_release(
         raise Exception("No browser_download_url for matched asset.")
 
     downloads_dir = output_folder / ".downloads"
-    downloads_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(downloads_dir)
     dest_file = downloads_dir / asset_name
 
-    print(f"Downloading asset to {dest_file} ...")
-    download_file(download_url, dest_file, session)
-    print("Download completed. Computing checksum...")
-
-    sha256 = _compute_sha256(dest_file)
-    print(f"SHA256: {sha256}")
+    log(f"Downloading asset to {dest_file} ...")
+    _, sha256 = download_file(download_url, dest_file, session)
+    log("Download completed.")
+    log(f"SHA256: {sha256}")
 
     # Extract if requested
     if enable_extract_zip and dest_file.suffix.lower() == ".zip":
-        print("Extracting zip...")
+        log("Extracting zip...")
         extract_zip(dest_file, output_folder, remove_zip=True, flatten_single_top_level=True)
         final_path = output_folder
     else:
-        output_folder.mkdir(parents=True, exist_ok=True)
         final_path = output_folder / asset_name
-        if final_path.exists():
-            final_path.unlink()
-        shutil.move(str(dest_file), str(final_path))
+        # .downloads is inside output_folder, so this is a single rename that also replaces an older copy
+        os.replace(dest_file, final_path)
         try:
             if not any(downloads_dir.iterdir()):
                 downloads_dir.rmdir()
+                _forget_dir(downloads_dir)
         except Exception:
             pass
-        print(f"Saved asset to {final_path}")
+        log(f"Saved asset to {final_path}")
 
     # Update manifest
     manifest_data = {
-        "repo": f"{repo_owner}/{repo_name}",
+        "repo": repo,
         "release_tag": tag_name,
         "release_id": release_id,
         "asset_name": asset_name,
@@ -244,13 +458,83 @@ def download_latest_github_release(
         "downloaded_at": datetime.now(timezone.utc).astimezone().isoformat(),
         "extracted_to": str(output_folder) if enable_extract_zip else None,
         "source_type": "release_asset",
+        "api_etag": etag,
     }
     _save_manifest(output_folder, manifest_data)
-    print(f"Manifest written to {output_folder / MANIFEST_FILENAME}")
+    log(f"Manifest written to {output_folder / MANIFEST_FILENAME}")
 
     return final_path
 
 
+# ----------------------------------------
+# Existing function: release asset download
+# (left unchanged in behavior; shared helpers used)
+# ----------------------------------------
+def download_latest_github_release(
+    repo_owner: str,
+    repo_name: str,
+    asset_pattern: str,
+    output_folder: str,
+    enable_extract_zip: bool = False,
+    force: bool = False,
+    log: Callable[[str], None] = print,
+) -> Path:
+    """
+    Download the latest GitHub release asset matching asset_pattern and save/extract it into output_folder.
+
+    Behavior:
+    - A manifest.json is stored in output_folder describing the downloaded release (tag, asset, sha256, etc).
+    - If manifest's release_tag matches the latest tag and force is False, the function will skip download.
+    - If enable_extract_zip is True and the asset is a .zip, it will be extracted into output_folder.
+    - Progress messages go to `log` (one string per call), so parallel callers can keep their output apart.
+    """
+    session = _get_github_session()
+    etag = _release_etag(_load_manifest(Path(output_folder)), asset_pattern, force)
+    release_data, etag = _query_latest_release(repo_owner, repo_name, session, etag, log)
+    return _install_release_asset(
+        f"{repo_owner}/{repo_name}", release_data, asset_pattern, Path(output_folder), enable_extract_zip, force, session, etag, log,
+    )
+
+
+def download_release_assets(
+    repo_owner: str,
+    repo_name: str,
+    assets: List[Tuple[str, str, bool]],
+    force: bool = False,
+    log: Callable[[str], None] = print,
+) -> List[Path]:
+    """
+    Same as download_latest_github_release, but for several assets of one release.
+
+    `assets` is a list of (asset_pattern, output_folder, enable_extract_zip). The release is queried
+    only once, and the assets are then downloaded in parallel. Results are returned in the same order,
+    and so are the assets' messages: each asset's are passed to `log` together once it is done.
+    """
+    session = _get_github_session()
+    # One query serves all assets, so the ETag is only sent if every manifest was written from the same response.
+    etags = {_release_etag(_load_manifest(Path(output_folder)), asset_pattern, force) for asset_pattern, output_folder, _ in assets}
+    etag = etags.pop() if len(etags) == 1 else None
+    release_data, etag = _query_latest_release(repo_owner, repo_name, session, etag, log)
+    messages = [[] for _ in assets]
+    with ThreadPoolExecutor(max_workers=len(assets)) as executor:
+        futures = [
+            executor.submit(
+                _install_release_asset,
+                f"{repo_owner}/{repo_name}", release_data, asset_pattern, Path(output_folder), enable_extract_zip, force, session, etag,
+                asset_messages.append,
+            )
+            for (asset_pattern, output_folder, enable_extract_zip), asset_messages in zip(assets, messages)
+        ]
+        results = []
+        for future, asset_messages in zip(futures, messages):
+            try:
+                results.append(future.result())
+            finally:
+                for message in asset_messages:
+                    log(message)
+        return results
+
+
 # ----------------------------------------
 # New function: repo snapshot (zipball) based on latest commit
 # ----------------------------------------
@@ -262,6 +546,7 @@ def download_latest_repo_snapshot(
     enable_extract_zip: bool = True,
     force: bool = False,
     archive_format: str = "zip",  # currently only 'zip' supported
+    log: Callable[[str], None] = print,
 ) -> Path:
     """
     Check the latest commit SHA for repo_owner/repo_name at `ref` (branch/tag/commit-ish).
@@ -269,6 +554,7 @@ def download_latest_repo_snapshot(
     zipball for that ref and extract (or save) into output_folder.
 
     The manifest records commit_sha so subsequent runs can skip when unchanged.
+    Progress messages go to `log`, as in download_latest_github_release.
     """
     if archive_format.lower() != "zip":
         raise NotImplementedError("Currently only 'zip' archive_format is supported")
@@ -279,10 +565,12 @@ def download_latest_repo_snapshot(
 
     # 1) Query latest commit for given ref
     commit_api = f"https://api.github.com/repos/{repo_owner}/{repo_name}/commits/{ref}"
-    print(f"Querying latest commit for {repo_owner}/{repo_name}@{ref} ...")
-    r = session.get(commit_api)
-    r.raise_for_status()
-    commit_data = r.json()
+    log(f"Querying latest commit for {repo_owner}/{repo_name}@{ref} ...")
+    etag = manifest.get("api_etag") if (not force and manifest and manifest.get("commit_sha")) else None
+    commit_data, etag = _api_get(commit_api, session, etag)
+    if commit_data is None:
+        # 304: the ref still points at the commit in the manifest
+        commit_data = {"sha": manifest["commit_sha"], "commit": {"committer": {"date": manifest.get("commit_date")}}}
     commit_sha = commit_data.get("sha")
     commit_date = None
     try:
@@ -293,14 +581,18 @@ def download_latest_repo_snapshot(
     if not commit_sha:
         raise Exception("Could not determine latest commit SHA for the specified ref.")
 
-    print(f"Latest commit SHA: {commit_sha}")
+    log(f"Latest commit SHA: {commit_sha}")
 
     # 2) decide whether to skip based on manifest
     if not force and manifest:
         old_commit = manifest.get("commit_sha")
         old_ref = manifest.get("ref")
         if old_commit and old_commit == commit_sha:
-            print(f"Skipping download: commit unchanged ({commit_sha}).")
+            log(f"Skipping download: commit unchanged ({commit_sha}).")
+            if etag and manifest.get("api_etag") != etag:
+                # so that the next run can ask with If-None-Match
+                manifest["api_etag"] = etag
+                _save_manifest(output_folder, manifest)
             if enable_extract_zip:
                 return output_folder
             else:
@@ -315,7 +607,7 @@ def download_latest_repo_snapshot(
     # API endpoint: https://api.github.com/repos/{owner}/{repo}/zipball/{ref}
     archive_api = f"https://api.github.com/repos/{repo_owner}/{repo_name}/zipball/{ref}"
     downloads_dir = output_folder / ".downloads"
-    downloads_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(downloads_dir)
 
     short_sha = commit_sha[:8]
     # sanitize ref for filename
@@ -323,31 +615,35 @@ def download_latest_repo_snapshot(
     archive_name = f"{repo_name}-{safe_ref}-{short_sha}.zip"
     dest_file = downloads_dir / archive_name
 
-    print(f"Downloading archive for commit {commit_sha} to {dest_file} ...")
-    download_file(archive_api, dest_file, session)
-    print("Download finished. Computing SHA256...")
-    sha256 = _compute_sha256(dest_file)
-    size = dest_file.stat().st_size
-    print(f"SHA256: {sha256}  size: {size} bytes")
-
     # 4) extract or store archive
     if enable_extract_zip:
-        print("Extracting archive...")
-        extract_zip(dest_file, output_folder, remove_zip=True, flatten_single_top_level=True)
+        # The archive is only needed for extraction, so it is not written out and read back;
+        # ZipFile reads it from the spool (in memory on Python 3.11+ unless it is large).
+        log(f"Downloading archive for commit {commit_sha} ...")
+        spool, sha256, size = _download_to_spool(archive_api, session, downloads_dir)
+        log("Download finished.")
+        log(f"SHA256: {sha256}  size: {size} bytes")
+        log("Extracting archive...")
+        with spool:
+            extract_zip(spool, output_folder, flatten_single_top_level=True)
         final_path = output_folder
-        print(f"Extraction completed into {final_path}")
+        log(f"Extraction completed into {final_path}")
     else:
-        output_folder.mkdir(parents=True, exist_ok=True)
+        log(f"Downloading archive for commit {commit_sha} to {dest_file} ...")
+        _, sha256 = download_file(archive_api, dest_file, session)
+        log("Download finished.")
+        size = dest_file.stat().st_size
+        log(f"SHA256: {sha256}  size: {size} bytes")
         final_path = output_folder / archive_name
-        if final_path.exists():
-            final_path.unlink()
-        shutil.move(str(dest_file), str(final_path))
+        # .downloads is inside output_folder, so this is a single rename that also replaces an older copy
+        os.replace(dest_file, final_path)
         try:
             if not any(downloads_dir.iterdir()):
                 downloads_dir.rmdir()
+                _forget_dir(downloads_dir)
         except Exception:
             pass
-        print(f"Saved archive to {final_path}")
+        log(f"Saved archive to {final_path}")
 
     # 5) write manifest
     manifest_data = {
@@ -361,15 +657,16 @@ def download_latest_repo_snapshot(
         "downloaded_at": datetime.now(timezone.utc).astimezone().isoformat(),
         "extracted_to": str(output_folder) if enable_extract_zip else None,
         "source_type": "zipball",
+        "api_etag": etag,
     }
     _save_manifest(output_folder, manifest_data)
-    print(f"Manifest written to {output_folder / MANIFEST_FILENAME}")
+    log(f"Manifest written to {output_folder / MANIFEST_FILENAME}")
 
     return final_path
 
 
 # ----------------------------------------
-# Simple CLI/demo when run as script
+# Simple CLI/demo when run as script (from the keitaiFSextractor folder: python -m utils.download)
 # ----------------------------------------
 if __name__ == "__main__":
     root = Path(__file__).resolve().parent.parent
@@ -377,72 +674,79 @@ if __name__ == "__main__":
     if not os.path.isdir(root / "tools"):
         raise FileNotFoundError("The tools folder that should be there is missing.")
 
-    # sleuthkit
-    output_dir = root / "tools" / "sleuthkit"
-    res = download_latest_github_release(
-        repo_owner="sleuthkit",
-        repo_name="sleuthkit",
-        asset_pattern=r"sleuthkit-.*-win32\.zip$",
-        output_folder=str(output_dir),
-        enable_extract_zip=True,
-        force=False,
-    )
-    print(f"SleuthKit result: {res}")
-    print("=" * 40)
-
-    # rfs_dumper
-    output_dir = root / "tools" / "rfs_dumper"
-    res = download_latest_github_release(
-        repo_owner="usernameak",
-        repo_name="keitai_fs_tools",
-        asset_pattern=r"rfs_dumper_xsr1app\.exe$",
-        output_folder=str(output_dir),
-        enable_extract_zip=False,
-        force=False,
-    )
-    print(f"rfs_dumper result: {res}")
-    print("=" * 40)
-
-    # toshiba_remap
-    output_dir = root / "tools" / "toshiba_remap"
-    res = download_latest_github_release(
-        repo_owner="usernameak",
-        repo_name="keitai_fs_tools",
-        asset_pattern=r"toshiba_remap\.exe$",
-        output_folder=str(output_dir),
-        enable_extract_zip=False,
-        force=False,
-    )
-    print(f"toshiba_remap result: {res}")
-    print("=" * 40)
+    def run_buffered(label, func, **kwargs):
+        # The downloads run side by side, so each one's messages are held back and printed together when it ends.
+        out = io.StringIO()
+        try:
+            res = func(**kwargs, log=lambda message: print(message, file=out))
+            print(f"{label} result: {res}", file=out)
+        finally:
+            print("=" * 40, file=out)
+            sys.stdout.write(out.getvalue())
+            sys.stdout.flush()
+
+    # The releases are independent, so their API queries and downloads overlap.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            # sleuthkit
+            executor.submit(
+                run_buffered,
+                "SleuthKit",
+                download_latest_github_release,
+                repo_owner="sleuthkit",
+                repo_name="sleuthkit",
+                asset_pattern=r"sleuthkit-.*-win32\.zip$",
+                output_folder=str(root / "tools" / "sleuthkit"),
+                enable_extract_zip=True,
+                force=False,
+            ),
+            # rfs_dumper / toshiba_remap (same release)
+            executor.submit(
+                run_buffered,
+                "rfs_dumper / toshiba_remap",
+                download_release_assets,
+                repo_owner="usernameak",
+                repo_name="keitai_fs_tools",
+                assets=[
+                    (r"rfs_dumper_xsr1app\.exe$", str(root / "tools" / "rfs_dumper"), False),
+                    (r"toshiba_remap\.exe$", str(root / "tools" / "toshiba_remap"), False),
+                ],
+                force=False,
+            ),
+        ]
+        for future in futures:
+            future.result()
 
 
     def download_github_helper(toolname, repo_owner, ref="main"):
         output_dir = root / "tools" / toolname
-        res = download_latest_repo_snapshot(
+        run_buffered(
+            toolname,
+            download_latest_repo_snapshot,
             repo_owner=repo_owner,
             repo_name=toolname,
             output_folder=str(output_dir),
             enable_extract_zip=True,
             ref=ref
         )
-        print(f"{toolname} result: {res}")
-        print("=" * 40)
 
     if not shutil.which("git"):
-        download_github_helper(toolname="various-keitai-assemble", repo_owner="irdkwia")
-        download_github_helper(toolname="fugue-tools", repo_owner="irdkwia")
-        download_github_helper(toolname="yaffs-tools", repo_owner="irdkwia")
-        download_github_helper(toolname="b4-ftl-extract", repo_owner="irdkwia")
-        download_github_helper(toolname="flash-ftl", repo_owner="irdkwia")
-        download_github_helper(toolname="c5a3-assemble", repo_owner="irdkwia")
-        download_github_helper(toolname="w-series-extract-fs", repo_owner="irdkwia")
-        download_github_helper(toolname="fs-tools", repo_owner="ZiplineGun", ref="master")
-        download_github_helper(toolname="TSK-FAT-AutoRecover", repo_owner="ZiplineGun")
-        download_github_helper(toolname="k", repo_owner="ZiplineGun")
-        download_github_helper(toolname="jefferson", repo_owner="ZiplineGun", ref="master")
-        download_github_helper(toolname="xsr3_reconstruct", repo_owner="bkerler")
-        download_github_helper(toolname="dumpefs2", repo_owner="Crawlerop")
-        download_github_helper(toolname="keitai-tools", repo_owner="memory-hunter")
-        download_github_helper(toolname="mld-tools", repo_owner="kagekiyo7")
-
+        # Every repository goes to its own folder, so the snapshots are fetched side by side
+        # (network-bound, so more workers than CPUs; as many as download_tools.py runs at once).
+        run_batch([
+            partial(download_github_helper, toolname="various-keitai-assemble", repo_owner="irdkwia"),
+            partial(download_github_helper, toolname="fugue-tools", repo_owner="irdkwia"),
+            partial(download_github_helper, toolname="yaffs-tools", repo_owner="irdkwia"),
+            partial(download_github_helper, toolname="b4-ftl-extract", repo_owner="irdkwia"),
+            partial(download_github_helper, toolname="flash-ftl", repo_owner="irdkwia"),
+            partial(download_github_helper, toolname="c5a3-assemble", repo_owner="irdkwia"),
+            partial(download_github_helper, toolname="w-series-extract-fs", repo_owner="irdkwia"),
+            partial(download_github_helper, toolname="fs-tools", repo_owner="ZiplineGun", ref="master"),
+            partial(download_github_helper, toolname="TSK-FAT-AutoRecover", repo_owner="ZiplineGun"),
+            partial(download_github_helper, toolname="k", repo_owner="ZiplineGun"),
+            partial(download_github_helper, toolname="jefferson", repo_owner="ZiplineGun", ref="master"),
+            partial(download_github_helper, toolname="xsr3_reconstruct", repo_owner="bkerler"),
+            partial(download_github_helper, toolname="dumpefs2", repo_owner="Crawlerop"),
+            partial(download_github_helper, toolname="keitai-tools", repo_owner="memory-hunter"),
+            partial(download_github_helper, toolname="mld-tools", repo_owner="kagekiyo7"),
+        ], max_workers=8)
@@ -0,0 +1,32 @@
+"""
+Run independent jobs side by side.
+
+Only for jobs whose outputs do not feed each other (different tools, different output folders).
+The jobs are expected to wait on subprocesses or the network, so threads are enough.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def default_workers():
+    return min(os.cpu_count() or 1, 4)
+
+
+def run_batch(callables, max_workers=None):
+    """Call every callable in a thread pool and return their results in the same order.
+
+    All jobs are run to the end even if one fails; the first failure (in the given order) is then raised.
+    """
+    callables = list(callables)
+    if not callables:
+        return []
+    if max_workers is None:
+        max_workers = default_workers()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(callables)))) as executor:
+        futures = [executor.submit(c) for c in callables]
+    # Leaving the with block waited for every job.
+    for future in futures:
+        if future.exception() is not None:
+            raise future.exception()
+    return [future.result() for future in futures]
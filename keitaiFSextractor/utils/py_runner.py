@@ -0,0 +1,204 @@
+"""
+Long-lived venv Python processes that run tool scripts one after another.
+
+Starting the venv interpreter and importing a tool's modules again for every call costs more than the
+call itself for the small per-image helpers, so a worker keeps them imported between jobs.
+Workers are keyed by script path, so two tools never share the modules they have imported.
+Only library imports (stdlib, the venv's packages) are kept between jobs: each job gets a fresh __main__,
+the tool's own modules (those in its folder) are imported again, and sys.argv, sys.path, os.environ and
+the working directory are put back afterwards, so one image's job cannot leave state behind for the next.
+
+The tool's stdout stays on the console (or is sent to devnull); the tool's stderr is merged into it,
+because the worker's own stderr pipe carries the results back.
+"""
+import atexit
+import json
+import os
+import subprocess
+import sys
+import threading
+
+_lock = threading.Lock()
+# py_path -> idle workers; a worker is taken out while it runs a job, so parallel calls each get their own.
+_idle = {}
+_all = []
+
+
+def _start(python):
+    proc = subprocess.Popen(
+        [python, os.path.abspath(__file__)],
+        stdin=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    with _lock:
+        _all.append(proc)
+    return proc
+
+
+def _discard(proc):
+    with _lock:
+        if proc in _all:
+            _all.remove(proc)
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait()
+    _close_pipes(proc)
+
+
+def _close_pipes(proc):
+    for pipe in (proc.stdin, proc.stderr):
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def run(python, py_path, argv, stdout=None, cwd=None):
+    """Run py_path with argv in a worker, like `python py_path *argv`. Raises CalledProcessError on failure."""
+    if stdout not in (None, subprocess.DEVNULL):
+        raise ValueError("A persistent worker can only inherit stdout or discard it.")
+
+    with _lock:
+        workers = _idle.get(py_path)
+        proc = workers.pop() if workers else None
+    if proc is None or proc.poll() is not None:
+        proc = _start(python)
+
+    job = {"script": py_path, "argv": argv, "cwd": cwd, "devnull": stdout == subprocess.DEVNULL}
+    try:
+        proc.stdin.write(json.dumps(job) + "\n")
+        proc.stdin.flush()
+        reply = proc.stderr.readline()
+    except OSError:
+        reply = ""
+    if not reply:
+        # The worker died (e.g. the tool called os._exit); it is not reused.
+        _discard(proc)
+        raise subprocess.CalledProcessError(proc.returncode or 1, [python, py_path] + argv)
+
+    with _lock:
+        _idle.setdefault(py_path, []).append(proc)
+    returncode = json.loads(reply)["returncode"]
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, [python, py_path] + argv)
+
+
+def _forget_after_fork():
+    # A forked child (e.g. a ProcessPoolExecutor worker) must not share the parent's pipes; it starts its own workers.
+    global _lock
+    _lock = threading.Lock()
+    _idle.clear()
+    _all.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_after_fork)
+
+
+@atexit.register
+def shutdown():
+    with _lock:
+        procs = list(_all)
+        _all.clear()
+        _idle.clear()
+    for proc in procs:
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        _close_pipes(proc)
+
+
+def _is_below(path, folder):
+    path = os.path.normcase(os.path.abspath(path))
+    folder = os.path.normcase(folder)
+    try:
+        return os.path.commonpath([path, folder]) == folder
+    except ValueError:  # another drive on Windows
+        return False
+
+
+def _serve():
+    import gc
+    import runpy
+    import traceback
+
+    # The tools must not import this folder's modules (download.py, const.py, ...) by accident.
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        del sys.path[0]
+
+    # fd 0 and fd 2 are the job and result pipes; the tools get devnull and the console instead,
+    # so nothing they read or write (even from C code or child processes) can mix into the protocol.
+    jobs = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    results = os.fdopen(os.dup(2), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(1, 2)
+    console = os.dup(1)
+    base_cwd = os.getcwd()
+    std = (sys.stdout, sys.stderr)
+
+    base_argv = list(sys.argv)
+    base_path = list(sys.path)
+    base_environ = dict(os.environ)
+
+    for line in jobs:
+        job = json.loads(line)
+        script = job["script"]
+
+        sys.stdout.flush()
+        if job["devnull"]:
+            os.dup2(devnull, 1)
+        modules_before = set(sys.modules)
+        sys.argv = [script] + job["argv"]
+        # as `python script` does
+        script_dir = os.path.dirname(os.path.abspath(script))
+        sys.path.insert(0, script_dir)
+        os.chdir(job["cwd"] or base_cwd)
+        try:
+            runpy.run_path(script, run_name="__main__")
+            returncode = 0
+        except SystemExit as e:
+            if e.code is None:
+                returncode = 0
+            elif isinstance(e.code, int):
+                returncode = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+        finally:
+            try:
+                sys.stdout, sys.stderr = std
+                sys.stdout.flush()
+                sys.stderr.flush()
+            except (OSError, ValueError):
+                pass
+            os.dup2(console, 1)
+            # new lists, in case the tool kept a reference to the ones it was given
+            sys.argv = list(base_argv)
+            sys.path = list(base_path)
+            if os.environ != base_environ:
+                os.environ.clear()
+                os.environ.update(base_environ)
+            os.chdir(base_cwd)
+            # The tool's own modules hold its globals, so they are imported afresh by the next job.
+            for name in set(sys.modules) - modules_before:
+                module_file = getattr(sys.modules[name], "__file__", None)
+                if module_file and _is_below(module_file, script_dir):
+                    del sys.modules[name]
+            # closes the files that only the finished job still referenced
+            gc.collect()
+
+        results.write(json.dumps({"returncode": returncode}) + "\n")
+        results.flush()
+
+
+if __name__ == "__main__":
+    _serve()
@@ -1,6 +1,7 @@
 import os
 import csv
 import re
+from functools import lru_cache
 
 with open(os.path.join("..\\models.csv"), encoding="utf8") as inf:
     model_infos = tuple(csv.DictReader(inf))
@@ -261,11 +262,17 @@ KTDUMPER_MODELS = [
     "so706i",
 ]
 
+_II_RE = re.compile(r"ii$")
+
+@lru_cache(maxsize=4096)
 def to_ktdumper_modelname(model_name):
     model_name = model_name.replace("μ", "u").replace("+", "p").lower()
-    model_name = re.sub(r"ii$", "2", model_name)
+    model_name = _II_RE.sub("2", model_name)
     return model_name
 
+# normalized once, not once per KTdumper model
+model_names = {to_ktdumper_modelname(m["Phone_Model"].strip()) for m in model_infos}
+
 for model in KTDUMPER_MODELS:
-    if model not in [to_ktdumper_modelname(m["Phone_Model"].strip()) for m in model_infos]:
+    if model not in model_names:
         print(model)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import hashlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "keitaiFSextractor"))
+
+HAS_REQUESTS = importlib.util.find_spec("requests") is not None
+if HAS_REQUESTS:
+    from utils import download
+
+
+class _FakeRaw:
+    def __init__(self, data):
+        self._buf = io.BytesIO(data)
+
+    def read(self, n, decode_content=False):
+        return self._buf.read(n)
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self.raw = _FakeRaw(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+class _FakeSession:
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, url, **kwargs):
+        return _FakeResponse(self.data)
+
+
+def _make_zipball():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("repo-abc123/README.md", "readme")
+        z.writestr("repo-abc123/src/tool.py", "print('x')\n" * 1000)
+    return buf.getvalue()
+
+
+@unittest.skipUnless(HAS_REQUESTS, "requests is not installed")
+class SpoolExtractTest(unittest.TestCase):
+    def _extract_through_spool(self, max_size):
+        data = _make_zipball()
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(download, "SNAPSHOT_SPOOL_MAX_SIZE", max_size):
+            out = Path(tmp) / "out"
+            spool, sha256, size = download._download_to_spool("https://example.invalid/zipball", _FakeSession(data), Path(tmp))
+            with spool:
+                download.extract_zip(spool, out, flatten_single_top_level=True)
+
+            self.assertEqual(sha256, hashlib.sha256(data).hexdigest())
+            self.assertEqual(size, len(data))
+            self.assertEqual((out / "README.md").read_text(), "readme")
+            self.assertEqual((out / "src" / "tool.py").read_text(), "print('x')\n" * 1000)
+
+    def test_extract_in_memory(self):
+        self._extract_through_spool(64 * 1024 * 1024)
+
+    def test_extract_spilled_to_disk(self):
+        self._extract_through_spool(16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "keitaiFSextractor"))
+
+import main
+
+
+@unittest.skipUnless(sys.platform.startswith("linux") and hasattr(os, "copy_file_range"), "copy_file_range is Linux only")
+class CopyInKernelTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self._tmp.name, "src.bin")
+        self.dst = os.path.join(self._tmp.name, "dst.bin")
+        self.data = os.urandom(256 * 1024 + 123)
+        with open(self.src, "wb") as fh:
+            fh.write(self.data)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_falls_back_when_copy_file_range_stops_early(self):
+        real_copy_file_range = os.copy_file_range
+        calls = []
+
+        def stop_after_first_chunk(src_fd, dst_fd, count, offset_src=None, offset_dst=None):
+            calls.append(offset_src)
+            if len(calls) > 1:
+                return 0
+            return real_copy_file_range(src_fd, dst_fd, min(count, 4096), offset_src, offset_dst)
+
+        with mock.patch.object(main.fcntl, "ioctl", side_effect=OSError("no reflink")), \
+                mock.patch.object(main.os, "copy_file_range", side_effect=stop_after_first_chunk):
+            main.copy_file(self.src, self.dst)
+
+        self.assertEqual(calls, [0, 4096])
+        with open(self.dst, "rb") as fh:
+            self.assertEqual(fh.read(), self.data)
+
+
+class MergeTreeTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self._tmp.name, "src")
+        self.dst = os.path.join(self._tmp.name, "dst")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fh:
+            fh.write(data)
+
+    def _read(self, path):
+        with open(path) as fh:
+            return fh.read()
+
+    def test_does_not_overwrite_a_taken_suffixed_name(self):
+        self._write(os.path.join(self.dst, "a.jpg"), "first")
+        self._write(os.path.join(self.dst, "a_01.jpg"), "earlier merge")
+        self._write(os.path.join(self.src, "a.jpg"), "second")
+
+        main.merge_tree(self.src, self.dst, "_01")
+
+        self.assertEqual(self._read(os.path.join(self.dst, "a.jpg")), "first")
+        self.assertEqual(self._read(os.path.join(self.dst, "a_01.jpg")), "earlier merge")
+        self.assertEqual(self._read(os.path.join(self.dst, "a_01_2.jpg")), "second")
+
+    def test_folder_and_file_with_the_same_name(self):
+        self._write(os.path.join(self.dst, "x"), "file")
+        self._write(os.path.join(self.dst, "y", "in_dst.txt"), "dst folder")
+        self._write(os.path.join(self.src, "x", "inside.txt"), "src folder")
+        self._write(os.path.join(self.src, "y"), "src file")
+        self._write(os.path.join(self.src, "z", "new.txt"), "merged")
+        self._write(os.path.join(self.dst, "z", "old.txt"), "kept")
+
+        main.merge_tree(self.src, self.dst, "_01")
+
+        self.assertEqual(self._read(os.path.join(self.dst, "x")), "file")
+        self.assertEqual(self._read(os.path.join(self.dst, "x_01", "inside.txt")), "src folder")
+        self.assertEqual(self._read(os.path.join(self.dst, "y", "in_dst.txt")), "dst folder")
+        self.assertEqual(self._read(os.path.join(self.dst, "y_01")), "src file")
+        self.assertEqual(sorted(os.listdir(os.path.join(self.dst, "z"))), ["new.txt", "old.txt"])
+
+
+Model = main.namedtuple("Model", ["Phone_Model"])
+
+
+def _linear_detect(input_file, model_infos):
+    # The lookup detect_model_info replaced: for each folder from the file upwards, the longest model
+    # name contained in it, the first CSV row winning among names of equal length.
+    parts = [part.lower() for part in os.path.abspath(input_file).split(os.sep) if part]
+    names = [(main.to_ktdumper_modelname(m.Phone_Model.strip()), m) for m in model_infos]
+    names = sorted([(name, m) for name, m in names if name], key=lambda t: len(t[0]), reverse=True)
+    for base in reversed(parts):
+        best = next((m for name, m in names if name in base), None)
+        if best is not None:
+            return best
+    return None
+
+
+class LoadModelInfosTest(unittest.TestCase):
+    def test_blank_lines_and_short_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "models.csv")
+            with open(csv_path, "w", encoding="utf8", newline="") as fh:
+                fh.write("Phone_Model,FTL,FS\r\nP902i,ftl_a,fat16\r\n\r\nN902i\r\nSH900i,ftl_b,fat12,extra\r\n\r\n")
+            model_infos = main.load_model_infos(csv_path)
+
+        self.assertEqual([tuple(m) for m in model_infos], [("P902i", "ftl_a", "fat16"), ("N902i", "", ""), ("SH900i", "ftl_b", "fat12")])
+        self.assertIsNone(main.read_model_info("FS", model_infos[1]))
+
+
+class DetectModelInfoTest(unittest.TestCase):
+    # "P902i" is a proper prefix of "P902iS"; "N902i" and "902iS" have the same length and can both match "n902is".
+    MODELS = [Model(name) for name in ["P902i", "N902i", "902iS", "P902iS", "SH900i", "D902i", "D902i"]]
+
+    def detect(self, path):
+        return main.detect_model_info(path, main.index_model_infos(self.MODELS))
+
+    def test_longer_name_wins_over_its_prefix(self):
+        self.assertEqual(self.detect(os.path.join("dumps", "KTdumper_2025-09-26_08-37-38_p902is_dump_nand", "nand.bin")).Phone_Model, "P902iS")
+        self.assertEqual(self.detect(os.path.join("dumps", "KTdumper_2025-09-26_08-37-38_p902i_dump_nand", "nand.bin")).Phone_Model, "P902i")
+
+    def test_first_row_wins_among_equal_lengths(self):
+        self.assertEqual(self.detect(os.path.join("dumps", "n902is", "nand.bin")).Phone_Model, "N902i")
+
+    def test_nearest_folder_wins(self):
+        # the file name is checked before its folders, even if a folder holds a longer name
+        self.assertEqual(self.detect(os.path.join("p902is", "sh900i_nand.bin")).Phone_Model, "SH900i")
+        self.assertIsNone(self.detect(os.path.join("dumps", "unknown", "nand.bin")))
+
+    def test_same_as_linear_lookup(self):
+        for path in ["p902is", "xp902isx", "n902is", "sh900i_p902i", "d902i", "p902", "P902iS_d902i", "902is"]:
+            for p in (path, os.path.join(path, "nand.bin"), os.path.join("p902i", path)):
+                self.assertIs(self.detect(p), _linear_detect(p, self.MODELS), p)
+
+    def test_model_name_without_a_digit_is_rejected(self):
+        # such a name could match a folder above the dump, like "media" or "home"
+        with self.assertRaises(ValueError):
+            main.index_model_infos(self.MODELS + [Model("Media")])
+
+    def test_same_as_linear_lookup_for_models_csv(self):
+        csv_path = os.path.join(os.path.dirname(main.__file__), "models.csv")
+        model_infos = main.load_model_infos(csv_path)
+        model_by_norm = main.index_model_infos(model_infos)
+        for m in model_infos:
+            name = m.Phone_Model.strip()
+            for p in (os.path.join("dumps", f"KTdumper_x_{name}_dump_nand", "nand.bin"), os.path.join(f"{name}s", f"{name}_nor.bin")):
+                self.assertIs(main.detect_model_info(p, model_by_norm), _linear_detect(p, model_infos), p)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "keitaiFSextractor"))
+
+from utils import py_runner
+
+# A tool that leaves as much state behind as it can: a counter in its own module, a global in __main__,
+# an extra sys.argv entry and sys.path entry, an environment variable, a changed cwd and an open file.
+_HELPER = """
+calls = 0
+"""
+
+_TOOL = """
+import json
+import os
+import sys
+
+import helper
+
+helper.calls += 1
+out = sys.argv[1]
+report = {
+    "helper_calls": helper.calls,
+    "main_global": globals().get("LEFT_BEHIND"),
+    "argv": sys.argv[1:],
+    "cwd": os.getcwd(),
+    "extra_path": "/left/behind" in sys.path,
+    "env": os.environ.get("KEITAIFS_TEST_LEFT_BEHIND"),
+}
+with open(out, "w") as fh:
+    json.dump(report, fh)
+
+LEFT_BEHIND = True
+sys.argv.append("--left-behind")
+sys.path.append("/left/behind")
+os.environ["KEITAIFS_TEST_LEFT_BEHIND"] = "1"
+os.chdir(os.path.dirname(out))
+leaked = open(out + ".leaked", "w")
+"""
+
+
+class PersistentWorkerStateTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = os.path.realpath(self._tmp.name)
+        tool_dir = os.path.join(self.tmp, "tool")
+        os.makedirs(tool_dir)
+        with open(os.path.join(tool_dir, "helper.py"), "w") as fh:
+            fh.write(textwrap.dedent(_HELPER))
+        self.tool = os.path.join(tool_dir, "tool.py")
+        with open(self.tool, "w") as fh:
+            fh.write(textwrap.dedent(_TOOL))
+
+    def tearDown(self):
+        py_runner.shutdown()
+        self._tmp.cleanup()
+
+    def _run(self, name, cwd):
+        out = os.path.join(self.tmp, name)
+        py_runner.run(sys.executable, self.tool, [out], cwd=cwd)
+        with open(out) as fh:
+            return json.load(fh)
+
+    def test_consecutive_jobs_do_not_share_state(self):
+        first = self._run("first.json", cwd=None)
+        second = self._run("second.json", cwd=self.tmp)
+
+        # the same worker ran both jobs
+        self.assertEqual(len(py_runner._all), 1)
+        for report, name in ((first, "first.json"), (second, "second.json")):
+            self.assertEqual(report["helper_calls"], 1)
+            self.assertIsNone(report["main_global"])
+            self.assertEqual(report["argv"], [os.path.join(self.tmp, name)])
+            self.assertFalse(report["extra_path"])
+            self.assertIsNone(report["env"])
+        self.assertEqual(first["cwd"], os.getcwd())
+        self.assertEqual(second["cwd"], self.tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()